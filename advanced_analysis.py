@@ -1,10 +1,22 @@
 import streamlit as st
 import json
-import re
+import time
 from datetime import datetime
 import PyPDF2 as pdf
 from io import BytesIO
 import base64
+import llm_client
+from ats_response import format_improvement_plan
+from job_runner import get_job_runner, show_job_status
+from llm_scheduler import INTERACTIVE
+from run_metrics import timed
+from resume_model import get_parsed_resume, hash_resume
+from local_scoring import score_resume
+from jd_library import get_requirements
+from section_cache import get_section_cache
+
+# Bump when the section optimization prompts change so cached sections are not reused
+SECTION_PROMPT_VERSION = 1
 
 class AdvancedResumeAnalyzer:
     def __init__(self, cohere_client):
@@ -12,60 +24,17 @@ class AdvancedResumeAnalyzer:
     
     def get_cohere_response(self, input_text):
         """Get response from Cohere AI"""
-        response = self.co.generate(
-            model='command',
-            prompt=input_text,
-            max_tokens=2000,
-            temperature=0.7,
-            k=0,
-            stop_sequences=[],
-            return_likelihoods='NONE'
-        )
-        return response.generations[0].text.strip()
+        return llm_client.generate(self.co, input_text, max_tokens=2000)
     
     def extract_resume_sections(self, resume_text):
         """Extract different sections from resume text"""
-        sections = {
-            'contact_info': '',
-            'summary': '',
-            'experience': '',
-            'education': '',
-            'skills': '',
-            'certifications': '',
-            'projects': ''
-        }
-        
-        # Extract contact information
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        phone_pattern = r'(\+?1[-.\s]?)?\(?([0-9]{3})\)?[-.\s]?([0-9]{3})[-.\s]?([0-9]{4})'
-        
-        emails = re.findall(email_pattern, resume_text)
-        phones = re.findall(phone_pattern, resume_text)
-        
-        if emails:
-            sections['contact_info'] += f"Email: {emails[0]}\n"
-        if phones:
-            sections['contact_info'] += f"Phone: {''.join(phones[0])}\n"
-        
-        # Extract sections using common headers
-        section_patterns = {
-            'summary': r'(?i)(summary|profile|objective|about)\s*:?\s*(.*?)(?=\n\s*[A-Z][A-Z\s]+:|\n\s*[A-Z][a-z]+\s*[A-Z][a-z]+|\Z)',
-            'experience': r'(?i)(experience|work\s*history|employment|professional\s*experience)\s*:?\s*(.*?)(?=\n\s*[A-Z][A-Z\s]+:|\n\s*[A-Z][a-z]+\s*[A-Z][a-z]+|\Z)',
-            'education': r'(?i)(education|academic|qualifications)\s*:?\s*(.*?)(?=\n\s*[A-Z][A-Z\s]+:|\n\s*[A-Z][a-z]+\s*[A-Z][a-z]+|\Z)',
-            'skills': r'(?i)(skills|technical\s*skills|competencies)\s*:?\s*(.*?)(?=\n\s*[A-Z][A-Z\s]+:|\n\s*[A-Z][a-z]+\s*[A-Z][a-z]+|\Z)',
-            'certifications': r'(?i)(certifications|certificates|licenses)\s*:?\s*(.*?)(?=\n\s*[A-Z][A-Z\s]+:|\n\s*[A-Z][a-z]+\s*[A-Z][a-z]+|\Z)',
-            'projects': r'(?i)(projects|portfolio|key\s*projects)\s*:?\s*(.*?)(?=\n\s*[A-Z][A-Z\s]+:|\n\s*[A-Z][a-z]+\s*[A-Z][a-z]+|\Z)'
-        }
-        
-        for section, pattern in section_patterns.items():
-            match = re.search(pattern, resume_text, re.DOTALL)
-            if match:
-                sections[section] = match.group(2).strip()
-        
-        return sections
+        return get_parsed_resume(resume_text).as_sections()
     
     def optimize_resume_section(self, section_content, job_description, section_type):
-        """Optimize a specific resume section based on job description"""
+        """Optimize a specific resume section based on job description
+
+        Results are cached per section content, job description and prompt version.
+        """
         
         optimization_prompts = {
             'summary': f"""
@@ -135,9 +104,41 @@ class AdvancedResumeAnalyzer:
             """
         }
         
-        if section_type in optimization_prompts:
-            return self.get_cohere_response(optimization_prompts[section_type])
-        return section_content
+        if section_type not in optimization_prompts:
+            return section_content
+        
+        cache = get_section_cache()
+        key = cache.make_key(section_type, section_content, job_description, SECTION_PROMPT_VERSION)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+        optimized = self.get_cohere_response(optimization_prompts[section_type])
+        cache.put(key, optimized)
+        return optimized
+    
+    def optimize_resume_by_section(self, resume_text, job_description):
+        """Optimize a resume one section at a time, paying only for sections not already cached
+
+        Returns the assembled resume and how many sections were reused from the cache.
+        """
+        sections = self.extract_resume_sections(resume_text)
+        cache = get_section_cache()
+        parts, reused, optimized = [], 0, 0
+        if sections.get('contact_info'):
+            parts.append(f"CONTACT INFORMATION\n{sections['contact_info'].strip()}")
+        for section_type in ('summary', 'skills', 'experience', 'education', 'certifications', 'projects'):
+            content = sections.get(section_type)
+            if not content:
+                continue
+            if section_type in ('summary', 'skills', 'experience', 'education'):
+                key = cache.make_key(section_type, content, job_description, SECTION_PROMPT_VERSION)
+                if cache.get(key) is not None:
+                    reused += 1
+                else:
+                    optimized += 1
+                content = self.optimize_resume_section(content, job_description, section_type)
+            parts.append(f"{section_type.upper()}\n{content.strip()}")
+        return {'resume': '\n\n'.join(parts), 'reused': reused, 'optimized': optimized}
     
     def generate_ats_optimized_resume(self, resume_text, job_description, analysis_results):
         """Generate a complete ATS-optimized resume"""
@@ -200,6 +201,10 @@ class AdvancedResumeAnalyzer:
     def generate_resume_improvements(self, resume_text, job_description, analysis_results):
         """Generate specific improvement suggestions"""
         
+        # A combined analysis already produced a plan from the same context
+        if analysis_results.get('Improvement Plan'):
+            return format_improvement_plan(analysis_results['Improvement Plan'])
+        
         missing_keywords = analysis_results.get('MissingKeywords', [])
         match_percentage = analysis_results.get('JD Match', '0%')
         
@@ -230,9 +235,13 @@ class AdvancedResumeAnalyzer:
         improvements = self.get_cohere_response(improvement_prompt)
         return improvements
     
-    def create_resume_template(self, job_description, user_profile):
+    def create_resume_template(self, job_description, user_profile, resume_text=''):
         """Create a custom resume template based on job requirements"""
         
+        # Let the template build on what the resume already contains
+        if resume_text:
+            user_profile = f"{user_profile}\n{get_parsed_resume(resume_text).profile()}"
+        
         template_prompt = f"""
         Create a custom ATS-friendly resume template for the following job:
         
@@ -252,8 +261,241 @@ class AdvancedResumeAnalyzer:
         template = self.get_cohere_response(template_prompt)
         return template
 
-def show_advanced_analysis_page():
-    """Display the Advanced Analysis page"""
+@st.cache_resource
+def get_analyzer():
+    """Build the advanced analyzer and its Cohere client once per process"""
+    from dotenv import load_dotenv
+    import os
+    import cohere
+    
+    load_dotenv()
+    co = cohere.Client(os.getenv("COHERE_API_KEY"))
+    return AdvancedResumeAnalyzer(co)
+
+@st.cache_resource
+def get_template_manager():
+    """Build the resume template manager once per process"""
+    from resume_templates import ResumeTemplates
+    return ResumeTemplates()
+
+# Each tab is a fragment, so its widgets rerun only the tab instead of the whole app
+
+@st.fragment
+@timed("Advanced: optimization tab")
+def show_optimization_tab(analyzer, resume_text, job_description, analysis_results, user_id, reanalyze=None):
+    """Resume optimization tab"""
+    job_runner = get_job_runner()
+    
+    st.subheader("🎯 Generate ATS-Optimized Resume")
+    st.markdown("Transform your resume into a job-winning document optimized for ATS systems.")
+    
+    if st.button("🚀 Generate Optimized Resume", type="primary"):
+        st.session_state.optimized_resume_job = job_runner.submit(
+            'optimized_resume', analyzer.generate_ats_optimized_resume,
+            resume_text, job_description, analysis_results, user_id=user_id, priority=INTERACTIVE
+        )
+    
+    if st.button("🧩 Optimize Section by Section",
+                 help="Optimize each section separately; sections unchanged since the last run are reused"):
+        st.session_state.section_optimization_job = job_runner.submit(
+            'section_optimization', analyzer.optimize_resume_by_section,
+            resume_text, job_description, user_id=user_id, priority=INTERACTIVE
+        )
+    
+    if st.session_state.get('optimized_resume_job'):
+        job = show_job_status(st.session_state.optimized_resume_job, "Resume optimization")
+        if job is not None:
+            # Failed and cancelled jobs are cleared too, so their status is shown only once
+            st.session_state.optimized_resume_job = None
+            if job['status'] == 'done':
+                st.session_state.optimized_resume = job['result']
+                st.success("✅ Optimized resume generated successfully!")
+    
+    if st.session_state.get('section_optimization_job'):
+        job = show_job_status(st.session_state.section_optimization_job, "Section optimization")
+        if job is not None:
+            st.session_state.section_optimization_job = None
+            if job['status'] == 'done':
+                st.session_state.optimized_resume = job['result']['resume']
+                st.success(f"✅ Optimized {job['result']['optimized']} section(s); "
+                           f"reused {job['result']['reused']} unchanged section(s) from the cache.")
+    
+    if st.session_state.get('optimized_resume'):
+        show_resume_editor(st.session_state.optimized_resume, job_description, user_id, reanalyze)
+
+def local_editor_score(resume_text, job_description):
+    """Score an edited resume locally, reusing the last score while the text is unchanged"""
+    key = (hash_resume(resume_text), job_description)
+    cached = st.session_state.get('editor_score')
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    result = score_resume(get_parsed_resume(resume_text), get_requirements(job_description))
+    st.session_state.editor_score = (key, result)
+    return result
+
+def show_resume_editor(optimized_resume, job_description, user_id, reanalyze=None):
+    """Editable optimized resume with a local ATS score that follows every committed edit
+
+    Edits only rerun the surrounding tab fragment and are scored locally; the LLM is
+    called only when a full re-analysis is requested.
+    """
+    # Start from the generated text whenever a new optimized resume arrives
+    if st.session_state.get('resume_editor_source') != optimized_resume:
+        st.session_state.resume_editor_source = optimized_resume
+        st.session_state.resume_editor = optimized_resume
+    
+    st.subheader("📄 Your ATS-Optimized Resume")
+    st.caption("Edit the text below; the local score updates when you click outside the box or press Ctrl+Enter.")
+    edited_resume = st.text_area("Optimized Resume", key="resume_editor", height=600)
+    
+    if job_description.strip():
+        started = time.perf_counter()
+        local_result = local_editor_score(edited_resume, job_description)
+        elapsed = (time.perf_counter() - started) * 1000
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            st.metric("Local ATS Score", local_result['JD Match'])
+        with col2:
+            st.metric("Missing Keywords", len(local_result['MissingKeywords']))
+        if local_result['MissingKeywords']:
+            st.markdown("**Still missing:** " + ", ".join(f"`{keyword}`" for keyword in local_result['MissingKeywords']))
+        st.caption(f"Scored locally in {elapsed:.0f} ms")
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        # Download button
+        st.download_button(
+            label="📥 Download Optimized Resume",
+            data=edited_resume,
+            file_name=f"optimized_resume_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt",
+            mime="text/plain"
+        )
+    with col2:
+        if st.button("↩️ Reset to Generated Version", disabled=edited_resume == optimized_resume):
+            st.session_state.resume_editor_source = None
+            st.rerun(scope="fragment")
+    with col3:
+        if reanalyze is not None and st.button("🤖 Full AI Re-analysis"):
+            st.session_state.editor_analysis_job = get_job_runner().submit(
+                'analysis', reanalyze, edited_resume, job_description, st.session_state.get('jd_requirements'),
+                user_id=user_id, priority=INTERACTIVE
+            )
+            st.session_state.editor_analysis_text = edited_resume
+    
+    if st.session_state.get('editor_analysis_job'):
+        job = show_job_status(st.session_state.editor_analysis_job, "AI re-analysis")
+        if job is not None:
+            st.session_state.editor_analysis_job = None
+            if job['status'] == 'done' and job['result']['analysis'] is not None:
+                # The edited version becomes the resume every other page works with
+                st.session_state.resume_text = st.session_state.editor_analysis_text
+                st.session_state.analysis_results = job['result']['analysis']
+                st.success(f"✅ AI re-analysis complete: JD Match {job['result']['analysis']['JD Match']}. "
+                           "'Analysis Results' now shows this version.")
+            elif job['status'] == 'done':
+                st.error(job['result']['error'])
+
+@st.fragment
+@timed("Advanced: improvement guide tab")
+def show_improvement_guide_tab(analyzer, resume_text, job_description, analysis_results, user_id):
+    """Improvement guide tab"""
+    job_runner = get_job_runner()
+    
+    st.subheader("📊 Detailed Improvement Guide")
+    st.markdown("Get specific recommendations to improve your resume's ATS compatibility.")
+    
+    if st.button("📈 Generate Improvement Guide", type="primary"):
+        st.session_state.improvement_guide_job = job_runner.submit(
+            'improvement_guide', analyzer.generate_resume_improvements,
+            resume_text, job_description, analysis_results, user_id=user_id, priority=INTERACTIVE
+        )
+    
+    if st.session_state.get('improvement_guide_job'):
+        job = show_job_status(st.session_state.improvement_guide_job, "Improvement guide")
+        if job is not None:
+            st.session_state.improvement_guide_job = None
+            if job['status'] == 'done':
+                st.session_state.improvement_guide = job['result']
+                st.success("✅ Improvement guide generated successfully!")
+    
+    if st.session_state.get('improvement_guide'):
+        # Display improvements
+        st.markdown("### 📋 Your Personalized Improvement Guide")
+        st.markdown(st.session_state.improvement_guide)
+
+@st.fragment
+@timed("Templates: selector")
+def show_template_selector_fragment():
+    """Template selector, rerun on its own when another template is chosen"""
+    get_template_manager().show_template_selector()
+
+@st.fragment
+@timed("Advanced: custom template")
+def show_custom_template_section(analyzer, resume_text, job_description, analysis_results, user_id):
+    """Custom template generation section"""
+    job_runner = get_job_runner()
+    
+    # Custom template generation
+    st.subheader("🎯 Generate Custom Template")
+    st.markdown("Get a personalized resume template based on your target job and profile.")
+    
+    if st.button("📋 Generate Custom Template", type="primary"):
+        user_profile = analysis_results.get('Profile Summary', '')
+        st.session_state.resume_template_job = job_runner.submit(
+            'resume_template', analyzer.create_resume_template,
+            job_description, user_profile, resume_text, user_id=user_id, priority=INTERACTIVE
+        )
+    
+    if st.session_state.get('resume_template_job'):
+        job = show_job_status(st.session_state.resume_template_job, "Custom template generation")
+        if job is not None:
+            st.session_state.resume_template_job = None
+            if job['status'] == 'done':
+                st.session_state.resume_template = job['result']
+                st.success("✅ Custom template generated successfully!")
+    
+    if st.session_state.get('resume_template'):
+        custom_template = st.session_state.resume_template
+        
+        # Display custom template
+        st.markdown("### 📄 Your Custom Resume Template")
+        st.text_area("Custom Resume Template", custom_template, height=600)
+        
+        # Download custom template
+        st.download_button(
+            label="📥 Download Custom Template",
+            data=custom_template,
+            file_name=f"custom_resume_template_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt",
+            mime="text/plain"
+        )
+
+@st.fragment
+@timed("Advanced: quick actions")
+def show_quick_actions():
+    """Quick action buttons"""
+    # Quick actions
+    st.markdown("### ⚡ Quick Actions")
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        if st.button("🔄 Re-analyze Resume"):
+            st.info("Go to 'Resume Analysis' to re-upload and analyze your resume")
+    
+    with col2:
+        if st.button("📊 View Full Results"):
+            st.info("Go to 'Analysis Results' to see detailed analysis")
+    
+    with col3:
+        if st.button("💡 Get Improvement Tips"):
+            st.info("Go to 'Resume Improvement Tips' for detailed suggestions")
+
+def show_advanced_analysis_page(reanalyze=None):
+    """Display the Advanced Analysis page
+
+    reanalyze(resume_text, job_description, requirements) runs the full LLM analysis
+    used for re-analyzing an edited optimized resume.
+    """
     
     st.title("🚀 Advanced Resume Analysis & Optimization")
     st.markdown("Transform your resume into an ATS-optimized, job-winning document!")
@@ -274,13 +516,10 @@ def show_advanced_analysis_page():
         return
     
     # Initialize advanced analyzer
-    from dotenv import load_dotenv
-    import os
-    import cohere
+    analyzer = get_analyzer()
     
-    load_dotenv()
-    co = cohere.Client(os.getenv("COHERE_API_KEY"))
-    analyzer = AdvancedResumeAnalyzer(co)
+    # Generations run as background jobs so they survive reruns
+    user_id = (st.session_state.get('user') or {}).get('id')
     
     # Create tabs for different features
     tab1, tab2, tab3, tab4 = st.tabs([
@@ -291,95 +530,21 @@ def show_advanced_analysis_page():
     ])
     
     with tab1:
-        st.subheader("🎯 Generate ATS-Optimized Resume")
-        st.markdown("Transform your resume into a job-winning document optimized for ATS systems.")
-        
-        if st.button("🚀 Generate Optimized Resume", type="primary"):
-            with st.spinner("Analyzing and optimizing your resume..."):
-                try:
-                    optimized_resume = analyzer.generate_ats_optimized_resume(
-                        resume_text, job_description, analysis_results
-                    )
-                    
-                    st.session_state.optimized_resume = optimized_resume
-                    st.success("✅ Optimized resume generated successfully!")
-                    
-                    # Display the optimized resume
-                    st.subheader("📄 Your ATS-Optimized Resume")
-                    st.text_area("Optimized Resume", optimized_resume, height=600)
-                    
-                    # Download button
-                    st.download_button(
-                        label="📥 Download Optimized Resume",
-                        data=optimized_resume,
-                        file_name=f"optimized_resume_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt",
-                        mime="text/plain"
-                    )
-                    
-                except Exception as e:
-                    st.error(f"Error generating optimized resume: {str(e)}")
+        show_optimization_tab(analyzer, resume_text, job_description, analysis_results, user_id, reanalyze)
     
     with tab2:
-        st.subheader("📊 Detailed Improvement Guide")
-        st.markdown("Get specific recommendations to improve your resume's ATS compatibility.")
-        
-        if st.button("📈 Generate Improvement Guide", type="primary"):
-            with st.spinner("Generating improvement recommendations..."):
-                try:
-                    improvements = analyzer.generate_resume_improvements(
-                        resume_text, job_description, analysis_results
-                    )
-                    
-                    st.session_state.improvement_guide = improvements
-                    st.success("✅ Improvement guide generated successfully!")
-                    
-                    # Display improvements
-                    st.markdown("### 📋 Your Personalized Improvement Guide")
-                    st.markdown(improvements)
-                    
-                except Exception as e:
-                    st.error(f"Error generating improvement guide: {str(e)}")
+        show_improvement_guide_tab(analyzer, resume_text, job_description, analysis_results, user_id)
     
     with tab3:
         st.subheader("📝 Resume Templates & Custom Generation")
         st.markdown("Choose from professional templates or generate a custom one based on your job.")
         
         # Template selection
-        from resume_templates import ResumeTemplates
-        template_manager = ResumeTemplates()
-        
-        # Show template selector
-        template_content, template_key = template_manager.show_template_selector()
+        show_template_selector_fragment()
         
         st.markdown("---")
         
-        # Custom template generation
-        st.subheader("🎯 Generate Custom Template")
-        st.markdown("Get a personalized resume template based on your target job and profile.")
-        
-        if st.button("📋 Generate Custom Template", type="primary"):
-            with st.spinner("Creating custom resume template..."):
-                try:
-                    user_profile = analysis_results.get('Profile Summary', '')
-                    custom_template = analyzer.create_resume_template(job_description, user_profile)
-                    
-                    st.session_state.resume_template = custom_template
-                    st.success("✅ Custom template generated successfully!")
-                    
-                    # Display custom template
-                    st.markdown("### 📄 Your Custom Resume Template")
-                    st.text_area("Custom Resume Template", custom_template, height=600)
-                    
-                    # Download custom template
-                    st.download_button(
-                        label="📥 Download Custom Template",
-                        data=custom_template,
-                        file_name=f"custom_resume_template_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt",
-                        mime="text/plain"
-                    )
-                    
-                except Exception as e:
-                    st.error(f"Error generating custom template: {str(e)}")
+        show_custom_template_section(analyzer, resume_text, job_description, analysis_results, user_id)
     
     with tab4:
         st.subheader("💡 Smart Suggestions")
@@ -435,18 +600,4 @@ def show_advanced_analysis_page():
             - **Certification Addition**: Consider adding relevant certifications
             """)
         
-        # Quick actions
-        st.markdown("### ⚡ Quick Actions")
-        col1, col2, col3 = st.columns(3)
-        
-        with col1:
-            if st.button("🔄 Re-analyze Resume"):
-                st.info("Go to 'Resume Analysis' to re-upload and analyze your resume")
-        
-        with col2:
-            if st.button("📊 View Full Results"):
-                st.info("Go to 'Analysis Results' to see detailed analysis")
-        
-        with col3:
-            if st.button("💡 Get Improvement Tips"):
-                st.info("Go to 'Resume Improvement Tips' for detailed suggestions")
+        show_quick_actions()
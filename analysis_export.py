@@ -0,0 +1,216 @@
+import argparse
+import csv
+import io
+import json
+import sqlite3
+import sys
+import tempfile
+from blob_store import get_blob_store
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    # Parquet export is optional; CSV and JSONL need only the standard library
+    pyarrow = None
+
+EXPORT_BATCH_SIZE = 500
+
+EXPORT_COLUMNS = ['id', 'user_id', 'created_at', 'match_score', 'resume_hash', 'jd_hash',
+                  'missing_keywords', 'profile_summary', 'source']
+TEXT_COLUMNS = ['resume_text', 'job_description']
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv', '.csv'),
+    'jsonl': ('application/x-ndjson', '.jsonl'),
+    'parquet': ('application/vnd.apache.parquet', '.parquet'),
+}
+
+
+def available_formats():
+    """Return the export formats that can be written in this environment"""
+    return [name for name in EXPORT_FORMATS if name != 'parquet' or pyarrow is not None]
+
+
+def iter_analyses(db_path="users.db", user_id=None, min_score=None, batch_size=EXPORT_BATCH_SIZE):
+    """Yield stored analyses one batch of record dicts at a time
+
+    SQLite steps the query lazily, so fetchmany keeps at most one batch of rows in
+    memory no matter how many analyses are stored.
+    """
+    query = '''
+        SELECT id, user_id, resume_hash, jd_hash, resume_text, job_description, analysis, match_score, created_at
+        FROM analyses
+    '''
+    conditions, params = [], []
+    if user_id is not None:
+        conditions.append('user_id = ?')
+        params.append(user_id)
+    if min_score is not None:
+        conditions.append('match_score >= ?')
+        params.append(min_score)
+    if conditions:
+        query += ' WHERE ' + ' AND '.join(conditions)
+    query += ' ORDER BY id'
+
+    blobs = get_blob_store(db_path)
+    conn = sqlite3.connect(db_path)
+    try:
+        cursor = conn.execute(query, params)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield [{
+                'id': row[0],
+                'user_id': row[1],
+                'resume_hash': row[2],
+                'jd_hash': row[3],
+                'resume_text': blobs.unpack(row[4]),
+                'job_description': blobs.unpack(row[5]),
+                'analysis': json.loads(blobs.unpack(row[6])),
+                'match_score': row[7],
+                'created_at': row[8]
+            } for row in rows]
+    finally:
+        conn.close()
+
+
+def flatten_record(record, include_text=False):
+    """Turn a stored analysis into one flat row for tabular formats"""
+    analysis = record['analysis']
+    row = {
+        'id': record['id'],
+        'user_id': record['user_id'],
+        'created_at': record['created_at'],
+        'match_score': record['match_score'],
+        'resume_hash': record['resume_hash'],
+        'jd_hash': record['jd_hash'],
+        'missing_keywords': '; '.join(str(keyword) for keyword in analysis.get('MissingKeywords') or []),
+        'profile_summary': analysis.get('Profile Summary', ''),
+        'source': analysis.get('Source', 'ai'),
+    }
+    if include_text:
+        row['resume_text'] = record['resume_text']
+        row['job_description'] = record['job_description']
+    return row
+
+
+def write_csv(batches, output, include_text=False):
+    """Write batches of records to a text stream as CSV; returns the row count"""
+    columns = EXPORT_COLUMNS + (TEXT_COLUMNS if include_text else [])
+    writer = csv.DictWriter(output, fieldnames=columns)
+    writer.writeheader()
+    count = 0
+    for batch in batches:
+        writer.writerows(flatten_record(record, include_text) for record in batch)
+        count += len(batch)
+    return count
+
+
+def write_jsonl(batches, output, include_text=False):
+    """Write batches of records to a text stream as JSON lines, keeping the full analysis"""
+    count = 0
+    for batch in batches:
+        for record in batch:
+            if not include_text:
+                record = {key: value for key, value in record.items() if key not in TEXT_COLUMNS}
+            output.write(json.dumps(record) + '\n')
+        count += len(batch)
+    return count
+
+
+def write_parquet(batches, output, include_text=False):
+    """Write batches of records to a binary stream as Parquet, one row group per batch"""
+    if pyarrow is None:
+        raise RuntimeError("Parquet export requires pyarrow (pip install pyarrow)")
+
+    columns = EXPORT_COLUMNS + (TEXT_COLUMNS if include_text else [])
+    types = {'id': pyarrow.int64(), 'user_id': pyarrow.int64(), 'match_score': pyarrow.int64()}
+    schema = pyarrow.schema([(column, types.get(column, pyarrow.string())) for column in columns])
+    count = 0
+    with pyarrow.parquet.ParquetWriter(output, schema) as writer:
+        for batch in batches:
+            rows = [flatten_record(record, include_text) for record in batch]
+            writer.write_table(pyarrow.Table.from_pylist(rows, schema=schema))
+            count += len(rows)
+    return count
+
+
+def export_analyses(output, export_format='csv', db_path="users.db", user_id=None, min_score=None,
+                    include_text=False, batch_size=EXPORT_BATCH_SIZE):
+    """Stream stored analyses into a binary stream; returns the number of rows written"""
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {export_format}")
+
+    batches = iter_analyses(db_path, user_id, min_score, batch_size)
+    if export_format == 'parquet':
+        return write_parquet(batches, output, include_text)
+
+    text_output = io.TextIOWrapper(output, encoding='utf-8', newline='', write_through=True)
+    try:
+        if export_format == 'csv':
+            return write_csv(batches, text_output, include_text)
+        return write_jsonl(batches, text_output, include_text)
+    finally:
+        text_output.flush()
+        # Leave the caller's stream open
+        text_output.detach()
+
+
+def show_export_section(user_id):
+    """Let a user download their own stored analyses as CSV, JSONL or Parquet
+
+    st.download_button holds the whole file in memory, so this is meant for one
+    user's analyses; exports of the full table go through the command line.
+    """
+    import streamlit as st
+
+    st.subheader("📦 Export My Analyses")
+    export_format = st.selectbox("Format", available_formats(), key="export_format")
+    include_text = st.checkbox("Include full resume and job description text", key="export_include_text")
+
+    if st.button("Prepare Export", key="prepare_export"):
+        # The export is written to disk in chunks and deleted once the button has been sent
+        with tempfile.TemporaryFile() as export_file:
+            with st.spinner("Exporting analyses..."):
+                count = export_analyses(export_file, export_format, user_id=user_id, include_text=include_text)
+            export_file.seek(0)
+            mime, extension = EXPORT_FORMATS[export_format]
+            st.download_button(
+                label=f"📥 Download {count} analyses ({export_format.upper()})",
+                data=export_file,
+                file_name=f"analyses{extension}",
+                mime=mime
+            )
+    st.caption("Administrators can export every stored analysis with `python analysis_export.py`.")
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Export stored resume analyses")
+    parser.add_argument("--format", choices=list(EXPORT_FORMATS), default="csv", help="Output format")
+    parser.add_argument("--output", "-o", help="Output file (default: stdout)")
+    parser.add_argument("--db", default="users.db", help="SQLite database to read from")
+    parser.add_argument("--user-id", type=int, help="Only export analyses by this user")
+    parser.add_argument("--min-score", type=int, help="Only export analyses scoring at least this much")
+    parser.add_argument("--include-text", action="store_true", help="Include resume and job description text")
+    parser.add_argument("--batch-size", type=int, default=EXPORT_BATCH_SIZE, help="Rows fetched per batch")
+    args = parser.parse_args()
+
+    if args.format == 'parquet' and pyarrow is None:
+        parser.error("Parquet export requires pyarrow (pip install pyarrow)")
+
+    if args.output:
+        with open(args.output, 'wb') as output:
+            count = export_analyses(output, args.format, args.db, args.user_id, args.min_score,
+                                    args.include_text, args.batch_size)
+    else:
+        count = export_analyses(sys.stdout.buffer, args.format, args.db, args.user_id, args.min_score,
+                                args.include_text, args.batch_size)
+        sys.stdout.buffer.flush()
+    print(f"Exported {count} analyses.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+import sqlite3
+import json
+import threading
+import numpy as np
+from jd_library import hash_jd
+from resume_model import hash_resume
+from chunked_analysis import percentage_value
+from near_duplicates import LSHIndex, minhash_signature, DUPLICATE_THRESHOLD
+from blob_store import get_blob_store
+
+
+class AnalysisStore:
+    """Stored resume analyses, with near-duplicate lookup over the resume texts
+
+    Every saved analysis keeps the MinHash signature of its resume. Signatures are
+    loaded into an in-memory LSH index on first use, so a new upload can be matched
+    against the whole pool without comparing it to every stored resume.
+    """
+
+    def __init__(self, db_path="users.db"):
+        self.db_path = db_path
+        self.index = None
+        self.jd_hashes = {}
+        self.lock = threading.Lock()
+        self.init_database()
+
+    def init_database(self):
+        """Create the analyses table if it doesn't exist"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS analyses (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER,
+                resume_hash TEXT NOT NULL,
+                jd_hash TEXT NOT NULL,
+                resume_text TEXT NOT NULL,
+                job_description TEXT NOT NULL,
+                analysis TEXT NOT NULL,
+                match_score INTEGER,
+                signature BLOB NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_analyses_hashes ON analyses (jd_hash, resume_hash)')
+
+        conn.commit()
+        conn.close()
+
+    def _row_to_record(self, row):
+        """Convert an analyses row into a record dict"""
+        blobs = get_blob_store(self.db_path)
+        return {
+            'id': row[0],
+            'user_id': row[1],
+            'resume_hash': row[2],
+            'jd_hash': row[3],
+            'resume_text': blobs.unpack(row[4]),
+            'job_description': blobs.unpack(row[5]),
+            'analysis': json.loads(blobs.unpack(row[6])),
+            'match_score': row[7],
+            'created_at': row[8]
+        }
+
+    def _load_index(self):
+        """Build the LSH index from every stored signature"""
+        index = LSHIndex()
+        conn = sqlite3.connect(self.db_path)
+        try:
+            for analysis_id, jd_hash, signature in conn.execute('SELECT id, jd_hash, signature FROM analyses'):
+                index.add(analysis_id, np.frombuffer(signature, dtype=np.uint32))
+                self.jd_hashes[analysis_id] = jd_hash
+        finally:
+            conn.close()
+        return index
+
+    def _get_index(self):
+        """Return the LSH index, loading it on first use"""
+        with self.lock:
+            if self.index is None:
+                self.index = self._load_index()
+            return self.index
+
+    def save(self, resume_text, job_description, analysis, user_id=None):
+        """Store an analysis and index its resume; returns the new analysis id"""
+        signature = minhash_signature(resume_text)
+        jd_hash = hash_jd(job_description)
+        # Long texts are stored as compressed blobs
+        blobs = get_blob_store(self.db_path)
+        conn = sqlite3.connect(self.db_path)
+        try:
+            cursor = conn.execute('''
+                INSERT INTO analyses (user_id, resume_hash, jd_hash, resume_text, job_description,
+                                      analysis, match_score, signature)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (user_id, hash_resume(resume_text), jd_hash, blobs.pack(resume_text), blobs.pack(job_description),
+                  blobs.pack(json.dumps(analysis)), percentage_value(analysis.get('JD Match', 0)), signature.tobytes()))
+            conn.commit()
+            analysis_id = cursor.lastrowid
+        finally:
+            conn.close()
+
+        with self.lock:
+            if self.index is not None:
+                self.index.add(analysis_id, signature)
+                self.jd_hashes[analysis_id] = jd_hash
+        return analysis_id
+
+    def get(self, analysis_id):
+        """Get a stored analysis by id"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute('''
+                SELECT id, user_id, resume_hash, jd_hash, resume_text, job_description, analysis, match_score, created_at
+                FROM analyses WHERE id = ?
+            ''', (analysis_id,))
+            row = cursor.fetchone()
+            return self._row_to_record(row) if row else None
+        finally:
+            conn.close()
+
+    def find_duplicate(self, resume_text, job_description, threshold=DUPLICATE_THRESHOLD):
+        """Find a stored analysis of a near-identical resume against the same job description
+
+        Returns the record with its estimated 'similarity', or None.
+        """
+        jd_hash = hash_jd(job_description)
+        for similarity, analysis_id in self._get_index().query(minhash_signature(resume_text), threshold):
+            if self.jd_hashes.get(analysis_id) != jd_hash:
+                continue
+            record = self.get(analysis_id)
+            if record is not None:
+                record['similarity'] = 1.0 if record['resume_hash'] == hash_resume(resume_text) else similarity
+                return record
+        return None
+
+    def delete(self, analysis_id):
+        """Remove a stored analysis"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            cursor = conn.execute('DELETE FROM analyses WHERE id = ?', (analysis_id,))
+            conn.commit()
+            deleted = cursor.rowcount > 0
+        finally:
+            conn.close()
+
+        with self.lock:
+            if self.index is not None:
+                self.index.remove(analysis_id)
+            self.jd_hashes.pop(analysis_id, None)
+        return deleted
+
+
+_analysis_store = None
+_analysis_store_lock = threading.Lock()
+
+
+def get_analysis_store():
+    """Return the process-wide analysis store shared by all Streamlit sessions"""
+    global _analysis_store
+    with _analysis_store_lock:
+        if _analysis_store is None:
+            _analysis_store = AnalysisStore()
+        return _analysis_store
@@ -2,38 +2,58 @@ import streamlit as st
 from streamlit_extras.add_vertical_space import add_vertical_space
 import cohere
 import os
-import PyPDF2 as pdf
+import time
+from io import BytesIO
 from dotenv import load_dotenv
-import json
 from auth import AuthManager
+import llm_client
+from llm_scheduler import scheduler, set_request_context, INTERACTIVE
+from pdf_utils import input_pdf_text
+from run_metrics import timed, record_run, get_run_summary
+from job_runner import get_job_runner, show_job_status, ACTIVE_STATUSES
+from chunked_analysis import ChunkedAnalyzer, needs_chunking
+from jd_library import JobDescriptionLibrary, format_requirements, get_requirements, hash_jd
+from local_scoring import score_resume, extract_keywords
+from resume_model import get_parsed_resume
+from keyword_verifier import verify_analysis
+from keyword_evidence import find_evidence
+from analysis_store import get_analysis_store
+from candidate_index import index_resume
+from ats_response import (
+    parse_json_response, normalize_analysis, normalize_improvement_plan, format_improvement_plan
+)
 
 load_dotenv() ## load all our environment variables
 
+# Resources are built once per process instead of on every script rerun
+@st.cache_resource
+def get_cohere_client():
+    return cohere.Client(os.getenv("COHERE_API_KEY"))
+
+@st.cache_resource
+def get_auth_manager():
+    return AuthManager()
+
+@st.cache_resource
+def get_jd_library():
+    return JobDescriptionLibrary()
+
+@st.cache_resource
+def get_chunked_analyzer():
+    return ChunkedAnalyzer(get_cohere_response, max_workers=int(os.getenv("CHUNK_CONCURRENCY", "4")))
+
 # Initialize Cohere client
-co = cohere.Client(os.getenv("COHERE_API_KEY"))
+co = get_cohere_client()
 
 # Initialize Auth Manager
-auth_manager = AuthManager()
-
-def get_cohere_response(input_text):
-    response = co.generate(
-        model='command',
-        prompt=input_text,
-        max_tokens=1000,
-        temperature=0.7,
-        k=0,
-        stop_sequences=[],
-        return_likelihoods='NONE'
-    )
-    return response.generations[0].text.strip()
+auth_manager = get_auth_manager()
+
+# Initialize Job Description Library
+jd_library = get_jd_library()
 
-def input_pdf_text(uploaded_file):
-    reader=pdf.PdfReader(uploaded_file)
-    text=""
-    for page in range(len(reader.pages)):
-        page=reader.pages[page]
-        text+=str(page.extract_text())
-    return text
+def get_cohere_response(input_text, max_tokens=1000):
+    # Identical concurrent prompts from different sessions share one Cohere call
+    return llm_client.generate(co, input_text, max_tokens=max_tokens)
 
 #Prompt Template
 input_prompt="""
@@ -60,6 +80,390 @@ Important:
 - Ensure the JSON is valid and properly formatted
 """
 
+# Same evaluation, but against the pre-parsed requirements record instead of the raw JD
+requirements_prompt="""
+You are a skilled ATS (Application Tracking System) with deep understanding of tech fields, software engineering, data science, data analysis, and big data engineering. 
+
+Your task is to evaluate the resume against the job requirements below and provide a JSON response.
+
+Resume: {text}
+Job Requirements:
+{requirements}
+
+Analyze the resume against the job requirements and provide your response in the following JSON format ONLY:
+
+{{
+    "JD Match": "85%",
+    "MissingKeywords": ["keyword1", "keyword2", "keyword3"],
+    "Profile Summary": "A comprehensive summary of the candidate's profile, skills, and experience relevant to the job requirements."
+}}
+
+Important:
+- JD Match should be a percentage as a string (e.g., "85%")
+- Missing must-have skills should weigh more heavily than nice-to-have skills
+- MissingKeywords should be an array of strings
+- Profile Summary should be a single string
+- Return ONLY the JSON object, no additional text or formatting
+- Ensure the JSON is valid and properly formatted
+"""
+
+# Analysis and detailed improvement plan in a single response
+combined_prompt="""
+You are a skilled ATS (Application Tracking System) with deep understanding of tech fields, software engineering, data science, data analysis, and big data engineering. 
+
+Your task is to evaluate the resume against the job below and, in the same response, write a detailed plan for improving the resume. Provide a JSON response.
+
+Resume: {text}
+{job_section}
+
+Provide your response in the following JSON format ONLY:
+
+{{
+    "JD Match": "85%",
+    "MissingKeywords": ["keyword1", "keyword2", "keyword3"],
+    "Profile Summary": "A comprehensive summary of the candidate's profile, skills, and experience relevant to the job.",
+    "Improvement Plan": {{
+        "Keyword Integration": ["How to incorporate a missing keyword naturally, with the section it belongs in"],
+        "Sample Achievement Statements": ["A rewritten, quantified achievement statement"],
+        "Skills Section Improvements": ["A specific change to the skills section"],
+        "Structure Suggestions": ["A specific change to the overall structure"]
+    }}
+}}
+
+Important:
+- JD Match should be a percentage as a string (e.g., "85%")
+- MissingKeywords should be an array of strings
+- Profile Summary should be a single string
+- Every Improvement Plan section should be an array of 2-5 specific, actionable strings
+- Return ONLY the JSON object, no additional text or formatting
+- Ensure the JSON is valid and properly formatted
+"""
+
+def build_analysis_prompt(text, jd, requirements, combined=False):
+    """Build the scoring prompt, reusing the JD library's parsed requirements when available"""
+    # Without structured requirements the model needs the full description
+    if requirements and (requirements['must_have'] or requirements['nice_to_have']):
+        if combined:
+            job_section = f"Job Requirements:\n{format_requirements(requirements)}"
+            return combined_prompt.format(text=text, job_section=job_section)
+        return requirements_prompt.format(text=text, requirements=format_requirements(requirements))
+
+    if combined:
+        return combined_prompt.format(text=text, job_section=f"Job Description: {jd}")
+    return input_prompt.format(text=text, jd=jd)
+
+def run_analysis(text, jd, requirements, combined=False, sections=None, incremental=False, previous=None):
+    """Run the LLM analysis of a resume against a job description
+
+    Long inputs are analyzed chunk by chunk when their extracted sections are given.
+    In incremental mode every resume is analyzed section by section, so that after an
+    edit only the changed sections are sent again; previous holds the sections and
+    JD of the last analyzed version.
+    Returns a dict with the validated 'analysis' (None if the response was unusable),
+    the 'raw_response' and an 'error' message.
+    """
+    if sections is not None and (incremental or needs_chunking(text, jd)):
+        # The compact requirements record stands in for a long JD when available
+        if needs_chunking(text, jd) and requirements and (requirements['must_have'] or requirements['nice_to_have']):
+            if previous is not None and hash_jd(previous[1]) == hash_jd(jd):
+                # previous holds the raw JD; the same JD is sent in the same compact form
+                previous = (previous[0], format_requirements(requirements))
+            jd = format_requirements(requirements)
+        analysis = get_chunked_analyzer().analyze(text, jd, sections, previous=previous)
+        return {'analysis': verify_analysis(analysis, text), 'raw_response': '', 'error': None}
+
+    response_dict = None
+    if combined:
+        response = get_cohere_response(build_analysis_prompt(text, jd, requirements, combined=True), max_tokens=2000)
+        response_dict = normalize_analysis(parse_json_response(response))
+
+    # Fall back to the analysis-only prompt if the combined response was unusable
+    if response_dict is None:
+        response = get_cohere_response(build_analysis_prompt(text, jd, requirements))
+        response_dict = parse_json_response(response)
+        if response_dict is None:
+            return {'analysis': None, 'raw_response': response,
+                    'error': "Unable to parse response as JSON. Please try again."}
+
+        # Validate the response structure
+        response_dict = normalize_analysis(response_dict)
+        if response_dict is None:
+            return {'analysis': None, 'raw_response': response,
+                    'error': "Response missing required fields. Please try again."}
+
+    # Keep the improvement plan if the combined call produced one
+    improvement_plan = normalize_improvement_plan(response_dict.pop('Improvement Plan', None))
+    if improvement_plan:
+        response_dict['Improvement Plan'] = improvement_plan
+    # Keywords the LLM reports missing but the resume contains are moved out before anyone sees them
+    return {'analysis': verify_analysis(response_dict, text), 'raw_response': response, 'error': None}
+
+def local_analysis(text, jd, requirements):
+    """Keyword-overlap analysis computed locally, in the same shape as the LLM analysis"""
+    if requirements is None:
+        requirements = {'must_have': [], 'nice_to_have': [], 'keywords': extract_keywords(jd)}
+    result = score_resume(get_parsed_resume(text), requirements)
+    return {
+        'JD Match': result['JD Match'],
+        'MissingKeywords': result['MissingKeywords'][:15],
+        'Profile Summary': "Preliminary keyword-match result computed locally. "
+                           "It will be replaced automatically when the AI analysis arrives.",
+        'Source': 'local'
+    }
+
+def build_improvement_prompt(results):
+    """Build the detailed improvement plan prompt from analysis results"""
+    return f"""
+            Based on the following analysis:
+            - Current Match: {results['JD Match']}
+            - Missing Keywords: {', '.join(results['MissingKeywords'])}
+            - Current Profile: {results['Profile Summary']}
+
+            Provide specific suggestions for improving the resume, including:
+            1. How to incorporate the missing keywords naturally
+            2. Sample achievement statements
+            3. Skills section improvements
+            4. Overall structure suggestions
+
+            Format the response in clear sections with bullet points.
+            """
+
+# Session state keys of background jobs and the keys their results are stored under
+BACKGROUND_JOB_RESULTS = {
+    'improvement_plan_job': 'detailed_improvement_plan',
+    'optimized_resume_job': 'optimized_resume',
+    'improvement_guide_job': 'improvement_guide',
+    'resume_template_job': 'resume_template'
+}
+
+def collect_background_results():
+    """Move results of finished background jobs into session state, whichever page is open"""
+    job_runner = get_job_runner()
+    for job_key, result_key in BACKGROUND_JOB_RESULTS.items():
+        job_id = st.session_state.get(job_key)
+        if not job_id:
+            continue
+        job = job_runner.get(job_id)
+        if job is not None and job['status'] == 'done':
+            st.session_state[result_key] = job['result']
+            st.session_state[job_key] = None
+
+def start_prefetch(results, resume_text, jd, user_id, include_improvement_plan=True, include_optimized_resume=False):
+    """Start the likely follow-up generations in the background right after an analysis"""
+    job_runner = get_job_runner()
+    prefetch_jobs = {}
+
+    # A combined analysis already produced the improvement plan
+    if include_improvement_plan and not results.get('Improvement Plan'):
+        prefetch_jobs['improvement_plan_job'] = job_runner.submit(
+            'improvement_plan', get_cohere_response, build_improvement_prompt(results), user_id=user_id
+        )
+
+    if include_optimized_resume:
+        from advanced_analysis import AdvancedResumeAnalyzer
+        analyzer = AdvancedResumeAnalyzer(co)
+        st.session_state.optimized_resume = None
+        prefetch_jobs['optimized_resume_job'] = job_runner.submit(
+            'optimized_resume', analyzer.generate_ats_optimized_resume, resume_text, jd, results, user_id=user_id
+        )
+
+    for job_key, job_id in prefetch_jobs.items():
+        st.session_state[job_key] = job_id
+    st.session_state.prefetch_jobs = prefetch_jobs
+
+def apply_analysis(response_dict):
+    """Store a finished LLM analysis and start the prefetches requested with it"""
+    st.session_state.analysis_results = response_dict
+    st.session_state.analysis_error = None
+    if response_dict.get('Improvement Plan'):
+        st.session_state.detailed_improvement_plan = format_improvement_plan(response_dict['Improvement Plan'])
+
+    options = st.session_state.get('prefetch_options') or {}
+    # Keep fresh analyses so later near-duplicate uploads can reuse them
+    if response_dict.get('Source') != 'reused':
+        get_analysis_store().save(st.session_state.resume_text, st.session_state.job_description,
+                                  response_dict, user_id=options.get('user_id'))
+    if options.get('improvement_plan') or options.get('optimized_resume'):
+        start_prefetch(
+            response_dict, st.session_state.resume_text, st.session_state.job_description, options['user_id'],
+            include_improvement_plan=options['improvement_plan'],
+            include_optimized_resume=options['optimized_resume']
+        )
+        st.session_state.prefetch_upload_key = options['upload_key']
+
+def collect_pending_analysis():
+    """Upgrade a preliminary local result in place once the LLM analysis has finished"""
+    job_id = st.session_state.get('analysis_job')
+    if not job_id:
+        return
+    job = get_job_runner().get(job_id)
+    if job is None or job['status'] in ACTIVE_STATUSES:
+        return
+
+    st.session_state.analysis_job = None
+    if job['status'] == 'done' and job['result']['analysis'] is not None:
+        apply_analysis(job['result']['analysis'])
+    elif job['status'] == 'done':
+        st.session_state.analysis_error = job['result']['error']
+    else:
+        st.session_state.analysis_error = job['error'] or "The AI analysis was cancelled."
+
+def cancel_prefetch():
+    """Cancel prefetched generations that belong to a previous resume"""
+    job_runner = get_job_runner()
+    for job_key, job_id in st.session_state.get('prefetch_jobs', {}).items():
+        job_runner.cancel(job_id)
+        if st.session_state.get(job_key) == job_id:
+            st.session_state[job_key] = None
+    st.session_state.prefetch_jobs = {}
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def extract_uploaded_text(file_bytes):
+    """Extract resume text once per distinct uploaded PDF"""
+    return input_pdf_text(BytesIO(file_bytes))
+
+def extract_sections(text):
+    """Split resume text into sections, parsing each distinct resume only once"""
+    return get_parsed_resume(text).as_sections()
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def get_keyword_evidence(resume_hash, jd_hash, _resume_text, _requirements):
+    """Locate the JD requirements in the resume once per (resume, JD) pair"""
+    return find_evidence(_resume_text, _requirements)
+
+def show_keyword_evidence(resume_text, jd, requirements):
+    """Show where the resume already satisfies each JD requirement"""
+    evidence = get_keyword_evidence(get_parsed_resume(resume_text).doc_hash, hash_jd(jd), resume_text, requirements)
+    satisfied = [item for item in evidence if item['count']]
+
+    st.subheader("✅ Requirements Found in Your Resume")
+    if not satisfied:
+        st.caption("None of the job's requirement terms were found in your resume.")
+        return
+    st.caption(f"{len(satisfied)} of {len(evidence)} requirement terms found.")
+    for item in satisfied:
+        with st.expander(f"{item['requirement']} · {item['priority']} · {item['count']} mention(s)"):
+            for snippet in item['snippets']:
+                st.markdown(snippet, unsafe_allow_html=True)
+
+def show_local_preview(text, jd):
+    """Render the instant local preview of an uploaded resume
+
+    Returns an empty placeholder where the AI results are filled in once they arrive.
+    """
+    sections = extract_sections(text)
+    preview = local_analysis(text, jd, get_requirements(jd)) if jd.strip() else None
+    found_sections = [name for name, content in sections.items() if name != 'contact_info' and content]
+
+    st.subheader("🔎 Instant Preview")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Local Keyword Match", preview['JD Match'] if preview else "—")
+    with col2:
+        st.metric("Sections Detected", len(found_sections))
+    with col3:
+        st.metric("Words", len(text.split()))
+
+    if sections['contact_info']:
+        st.markdown("**Contact Info:**  \n" + sections['contact_info'].strip().replace('\n', '  \n'))
+    else:
+        st.caption("No email address or phone number detected.")
+
+    if preview and preview['MissingKeywords']:
+        st.markdown("**Job keywords not found in your resume:** " +
+                    ", ".join(f"`{keyword}`" for keyword in preview['MissingKeywords']))
+
+    with st.expander("📑 Extracted Sections"):
+        for name in found_sections:
+            st.markdown(f"**{name.replace('_', ' ').title()}**")
+            st.text(sections[name][:800])
+
+    return st.empty()
+
+def show_ai_results(placeholder, results):
+    """Fill the preview placeholder with the AI-generated JD Match and Profile Summary"""
+    with placeholder.container():
+        st.markdown("**🤖 AI Analysis**")
+        st.metric("JD Match", results['JD Match'])
+        st.info(results['Profile Summary'])
+
+@st.fragment
+@timed("Templates: workspace")
+def show_template_workspace():
+    """Template selector, statistics and tips; interactions rerun only this fragment"""
+    from advanced_analysis import get_template_manager
+    
+    # Show template selector
+    template_content, template_key = get_template_manager().show_template_selector()
+    
+    # Additional template features
+    st.markdown("---")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.subheader("📊 Template Statistics")
+        st.info(f"""
+        **Selected Template**: {template_key.title()}
+        **ATS Compatibility**: ✅ Optimized
+        **Industry Focus**: {template_key.title()}
+        **Best For**: {template_key.replace('_', ' ').title()} roles
+        """)
+    
+    with col2:
+        st.subheader("🎯 Quick Actions")
+        if st.button("📋 Use This Template"):
+            st.success("Template ready! Copy the content above and customize it with your information.")
+        
+        if st.button("🔄 Try Another Template"):
+            st.rerun(scope="fragment")
+    
+    # Template customization tips
+    st.markdown("---")
+    st.subheader("💡 Template Customization Tips")
+    
+    tips = {
+        'professional': [
+            "Use action verbs to start each bullet point",
+            "Include quantifiable achievements with numbers",
+            "Keep formatting consistent and clean",
+            "Use standard section headers for ATS compatibility",
+            "Tailor content to match job requirements"
+        ],
+        'technical': [
+            "List technologies with proficiency levels",
+            "Include specific project details and results",
+            "Highlight technical achievements and innovations",
+            "Use industry-standard terminology",
+            "Include links to GitHub, portfolio, or demos"
+        ],
+        'executive': [
+            "Focus on leadership and strategic achievements",
+            "Include quantifiable business impact",
+            "Highlight team management and budget responsibility",
+            "Emphasize financial and operational results",
+            "Include board memberships and professional affiliations"
+        ],
+        'entry_level': [
+            "Emphasize relevant coursework and academic projects",
+            "Include internships, volunteer work, and part-time jobs",
+            "Highlight transferable skills and achievements",
+            "Show enthusiasm and motivation for the role",
+            "Include academic achievements if strong (GPA, honors)"
+        ],
+        'creative': [
+            "Include portfolio links and creative samples",
+            "Highlight creative achievements and client work",
+            "Show range of creative skills and disciplines",
+            "Include specific projects with results",
+            "Emphasize innovation and creative problem-solving"
+        ]
+    }
+    
+    template_tips = tips.get(template_key, tips['professional'])
+    for i, tip in enumerate(template_tips, 1):
+        st.markdown(f"{i}. {tip}")
+
 def show_authentication_page():
     """Show authentication page with login and signup options"""
     st.title("🎯 Smart Resume ATS")
@@ -100,6 +504,9 @@ def show_main_application():
     """Show the main resume analysis application"""
     user = auth_manager.get_current_user()
     
+    # LLM calls made while rendering this page are interactive requests by this user
+    set_request_context(user['id'], INTERACTIVE)
+    
     # Sidebar navigation
     st.sidebar.title("Smart ATS for Resumes")
     
@@ -115,6 +522,8 @@ def show_main_application():
         "Resume Analysis", 
         "Analysis Results", 
         "Advanced Analysis",
+        "Candidate Matching",
+        "Resume Inbox",
         "Resume Templates",
         "Resume Improvement Tips", 
         "Detailed Improvement Plan",
@@ -131,6 +540,18 @@ def show_main_application():
     - [Github](https://github.com/praj2408/End-To-End-Resume-ATS-Tracking-LLM-Project-With-Google-Gemini-Pro) Repository
     """)
 
+    with st.sidebar.expander("⚙️ System Metrics"):
+        llm_metrics = llm_client.single_flight.get_metrics()
+        st.write(f"LLM requests: {llm_metrics['requests']}")
+        st.write(f"Cohere calls made: {llm_metrics['executed']}")
+        st.write(f"Coalesced duplicates: {llm_metrics['coalesced']}")
+        scheduler_metrics = scheduler.get_metrics()
+        st.write(f"Concurrency limit: {scheduler_metrics['active']}/{scheduler_metrics['limit']} in use")
+        st.write(f"Queued calls: {scheduler_metrics['waiting']} ({scheduler_metrics['interactive_waiting']} interactive)")
+        st.write(f"Throttled (429): {scheduler_metrics['rate_limited']}, rejected: {scheduler_metrics['rejected']}")
+        for scope, timing in get_run_summary().items():
+            st.write(f"{scope}: last {timing['last_ms']:.0f} ms, avg {timing['avg_ms']:.0f} ms ({timing['runs']} runs)")
+
     add_vertical_space(2)
     st.sidebar.write("Made with ❤ by Bhoomika Vishwanath.")
 
@@ -147,88 +568,196 @@ def show_main_application():
     if 'resume_text' not in st.session_state:
         st.session_state.resume_text = ''
 
+    if 'jd_requirements' not in st.session_state:
+        st.session_state.jd_requirements = None
+
+    # Pick up results of generations that finished in the background
+    collect_pending_analysis()
+    collect_background_results()
+
     if page == "Resume Analysis":
         st.title("Smart Application Tracking System")
         st.text("Improve Your Resume ATS")
         
-        jd = st.text_area("Paste the Job Description")
+        # Job description picker backed by the JD library
+        jd_options = {"✏️ Paste a new job description": None}
+        for record in jd_library.list_job_descriptions():
+            jd_options[f"{record['title']} (#{record['id']}, used {record['use_count']}x)"] = record
+
+        selected_jd = st.selectbox(
+            "Job Description Library",
+            options=list(jd_options.keys()),
+            help="Reuse a saved job description; its requirements are parsed only once"
+        )
+        selected_record = jd_options[selected_jd]
+
+        if selected_record is None:
+            jd = st.text_area("Paste the Job Description")
+        else:
+            jd = selected_record['jd_text']
+            with st.expander("📌 Parsed Requirements"):
+                st.text(format_requirements(selected_record['requirements']))
         uploaded_file = st.file_uploader("Upload Your Resume", type="pdf", help="Please upload the pdf")
 
+        # Prefetched follow-ups are only useful for the resume they were started for
+        upload_key = (uploaded_file.name, uploaded_file.size) if uploaded_file is not None else None
+        # The uploader comes back empty when returning from another page; that alone keeps the prefetch
+        if upload_key is not None and upload_key != st.session_state.get('prefetch_upload_key') \
+                and st.session_state.get('prefetch_jobs'):
+            cancel_prefetch()
+
+        # Local preview renders immediately; AI results fill in below it when they arrive
+        ai_placeholder = None
+        if uploaded_file is not None:
+            ai_placeholder = show_local_preview(extract_uploaded_text(uploaded_file.getvalue()), jd)
+            if st.session_state.get('analysis_upload_key') == upload_key:
+                results = st.session_state.analysis_results
+                if results is not None and results.get('Source') != 'local':
+                    show_ai_results(ai_placeholder, results)
+                elif st.session_state.get('analysis_job'):
+                    with ai_placeholder.container():
+                        show_job_status(st.session_state.analysis_job, "AI analysis")
+            st.markdown("---")
+
+        combined_mode = st.checkbox(
+            "⚡ Combined analysis",
+            value=True,
+            help="Generate the analysis and the detailed improvement plan in a single AI call"
+        )
+
+        col1, col2 = st.columns(2)
+        with col1:
+            prefetch_enabled = st.checkbox(
+                "🔮 Prefetch improvement plan",
+                value=True,
+                help="Start the detailed improvement plan in the background as soon as the analysis finishes"
+            )
+        with col2:
+            prefetch_optimized = st.checkbox(
+                "🔮 Also prefetch optimized resume",
+                value=False,
+                help="Start generating the ATS-optimized resume in the background as well"
+            )
+
+        col1, col2 = st.columns(2)
+        with col1:
+            chunked_mode = st.checkbox(
+                "🧩 Chunked analysis for long documents",
+                value=True,
+                help="Split long resumes and job descriptions by section and analyze the parts concurrently"
+            )
+        with col2:
+            reuse_duplicates = st.checkbox(
+                "♻️ Reuse results for near-duplicate resumes",
+                value=True,
+                help="Skip the AI call when a near-identical resume was already analyzed against this job description"
+            )
+
+        incremental_mode = st.checkbox(
+            "🔁 Incremental re-analysis of edited resumes",
+            value=False,
+            help="Analyze the resume section by section and keep each result, so resubmitting after an edit "
+                 "only sends the changed sections to the AI"
+        )
+
+        col1, col2 = st.columns(2)
+        with col1:
+            deadline_mode = st.checkbox(
+                "⏱️ Deadline mode",
+                value=True,
+                help="Show a local keyword-match result if the AI analysis takes longer than the deadline"
+            )
+        with col2:
+            deadline = st.number_input(
+                "Deadline (seconds)", min_value=1, max_value=120,
+                value=int(os.getenv("ANALYSIS_DEADLINE_SECONDS", "15")),
+                disabled=not deadline_mode
+            )
+
         submit = st.button("Submit")
 
         if submit:
             if uploaded_file is not None:
-                text = input_pdf_text(uploaded_file)
+                cancel_prefetch()
+                if st.session_state.get('analysis_job'):
+                    get_job_runner().cancel(st.session_state.analysis_job)
+                    st.session_state.analysis_job = None
+
+                text = extract_uploaded_text(uploaded_file.getvalue())
+                previous = None
+                previous_results = st.session_state.get('analysis_results')
+                if incremental_mode and previous_results and previous_results.get('Source') != 'local' \
+                        and st.session_state.get('resume_text'):
+                    previous = (extract_sections(st.session_state.resume_text), st.session_state.job_description)
+                # Make the resume searchable from the Candidate Matching page
+                index_resume(get_parsed_resume(text).doc_hash, text, uploaded_file.name)
                 # Store resume text and job description in session state
                 st.session_state.resume_text = text
                 st.session_state.job_description = jd
+                st.session_state.analysis_upload_key = upload_key
+                st.session_state.detailed_improvement_plan = None
                 
-                formatted_prompt = input_prompt.format(text=text, jd=jd)
-                response = get_cohere_response(formatted_prompt)
+                requirements = jd_library.get_or_create(jd)['requirements'] if jd.strip() else None
+                st.session_state.jd_requirements = requirements
+                st.session_state.prefetch_options = {
+                    'improvement_plan': prefetch_enabled,
+                    'optimized_resume': prefetch_optimized,
+                    'user_id': user['id'],
+                    'upload_key': upload_key
+                }
                 
-                try:
-                    response = response.replace('\n', ' ').strip()
-                    if response.startswith("```json"):
-                        response = response[7:]
-                    if response.endswith("```"):
-                        response = response[:-3]
-                    
-                    # Clean up the response further
-                    response = response.strip()
-                    
-                    # Try to clean up the response if it's not valid JSON
-                    try:
-                        response_dict = json.loads(response)
-                    except json.JSONDecodeError as e:
-                        # If JSON parsing fails, try to extract JSON from the response
-                        import re
-                        # Try multiple patterns to extract JSON
-                        json_patterns = [
-                            r'\{.*\}',
-                            r'\{[^}]*"JD Match"[^}]*\}',
-                            r'\{[^}]*"MissingKeywords"[^}]*\}',
-                            r'\{[^}]*"Profile Summary"[^}]*\}'
-                        ]
-                        
-                        response_dict = None
-                        for pattern in json_patterns:
-                            json_match = re.search(pattern, response, re.DOTALL)
-                            if json_match:
-                                try:
-                                    response_dict = json.loads(json_match.group())
-                                    break
-                                except json.JSONDecodeError:
-                                    continue
-                        
-                        if response_dict is None:
-                            st.error("Unable to parse response as JSON. Please try again.")
-                            st.text("Raw response for debugging:")
-                            st.code(response)
-                            st.text(f"JSON Error: {str(e)}")
-                            st.stop()
-                    
-                    # Handle Profile Summary if it's an array instead of string
-                    if 'Profile Summary' in response_dict and isinstance(response_dict['Profile Summary'], list):
-                        response_dict['Profile Summary'] = ' '.join(response_dict['Profile Summary'])
-                    
-                    # Validate the response structure
-                    required_keys = ['JD Match', 'MissingKeywords', 'Profile Summary']
-                    if not all(key in response_dict for key in required_keys):
-                        st.error("Response missing required fields. Please try again.")
+                # An edited resubmission is re-analyzed incrementally rather than matched to its old version
+                duplicate = get_analysis_store().find_duplicate(text, jd) if reuse_duplicates and previous is None else None
+                if duplicate is not None:
+                    # Same job description, near-identical resume: no need to call the LLM again
+                    response_dict = verify_analysis(duplicate['analysis'], text)
+                    response_dict['Source'] = 'reused'
+                    apply_analysis(response_dict)
+                    show_ai_results(ai_placeholder, response_dict)
+                    st.success(f"♻️ This resume is {duplicate['similarity']:.0%} similar to one already analyzed "
+                               "for this job description, so its analysis was reused. "
+                               "Untick 'Reuse results' to run a fresh analysis.")
+                else:
+                    job_runner = get_job_runner()
+                    job_id = job_runner.submit(
+                        'analysis', run_analysis, text, jd, requirements, combined_mode,
+                        sections=extract_sections(text) if chunked_mode or incremental_mode else None,
+                        incremental=incremental_mode, previous=previous,
+                        user_id=user['id'], priority=INTERACTIVE
+                    )
+                    with ai_placeholder.container():
+                        with st.spinner("Analyzing your resume..."):
+                            job = job_runner.wait(job_id, timeout=deadline if deadline_mode else None)
+                
+                    if job['status'] in ACTIVE_STATUSES:
+                        # Past the deadline: show the local result now and upgrade it when the LLM answers
+                        st.session_state.analysis_job = job_id
+                        st.session_state.analysis_error = None
+                        st.session_state.analysis_results = local_analysis(text, jd, requirements)
+                        with ai_placeholder.container():
+                            show_job_status(job_id, "AI analysis")
+                        st.warning(f"⏱️ The AI analysis is taking longer than {deadline} seconds. "
+                                   "A local keyword-match result is available in 'Analysis Results' "
+                                   "and will be upgraded automatically when the AI analysis arrives.")
+                    elif job['status'] != 'done':
+                        st.error(f"Error processing the response. Please try again. Error: {job['error']}")
+                    elif job['result']['error']:
+                        st.error(job['result']['error'])
                         st.text("Raw response for debugging:")
-                        st.code(response)
-                        st.stop()
-                    
-                    # Store results in session state
-                    st.session_state.analysis_results = response_dict
+                        st.code(job['result']['raw_response'])
+                    else:
+                        apply_analysis(job['result']['analysis'])
+                        show_ai_results(ai_placeholder, job['result']['analysis'])
+                        reanalysis = job['result']['analysis'].get('Reanalysis')
+                        if reanalysis:
+                            changed = ', '.join(reanalysis['changed_sections']) or 'none'
+                            st.info(f"🔁 Changed sections: {changed}"
+                                    f"{' (job description changed too)' if reanalysis['jd_changed'] else ''}. "
+                                    f"Reused {reanalysis['reused_chunks']} cached section result(s) and "
+                                    f"analyzed {reanalysis['analyzed_chunks']}.")
                     
-                    # Redirect to results page
-                    st.success("Analysis completed! Navigate to 'Analysis Results' to view your results.")
-                    
-                except Exception as e:
-                    st.error(f"Error processing the response. Please try again. Error: {str(e)}")
-                    st.text("Raw response for debugging:")
-                    st.code(response)
+                        # Redirect to results page
+                        st.success("Analysis completed! Navigate to 'Analysis Results' to view your results.")
             else:
                 st.error("Please upload a PDF resume first.")
 
@@ -241,6 +770,14 @@ def show_main_application():
         else:
             response_dict = st.session_state.analysis_results
             
+            if response_dict.get('Source') == 'local':
+                if st.session_state.get('analysis_job'):
+                    st.info("⚡ Showing a preliminary local keyword-match result while the AI analysis finishes.")
+                    show_job_status(st.session_state.analysis_job, "AI analysis")
+                elif st.session_state.get('analysis_error'):
+                    st.warning(f"The AI analysis could not be completed, so this is a local keyword-match result. "
+                               f"Error: {st.session_state.analysis_error}")
+            
             # Add ATS Score Meter
             st.subheader("📈 ATS Score Meter")
             match_percentage = response_dict['JD Match']
@@ -275,9 +812,30 @@ def show_main_application():
             else:
                 st.error(f"🎯 JD Match: {response_dict['JD Match']}")
             
+            # Local keyword-overlap score from the parsed JD requirements
+            if st.session_state.jd_requirements:
+                local_result = score_resume(get_parsed_resume(st.session_state.resume_text), st.session_state.jd_requirements)
+                st.caption(f"Local keyword match: {local_result['JD Match']} "
+                           f"({len(local_result['MatchedKeywords'])} of "
+                           f"{len(local_result['MatchedKeywords']) + len(local_result['MissingKeywords'])} requirement terms found)")
+            
             st.subheader("🔍 Missing Keywords")
+            possible_typos = {str(item['keyword']): item['evidence'] for item in response_dict.get('PossibleTypos') or []}
             for keyword in response_dict['MissingKeywords']:
-                st.markdown(f"- {keyword}")
+                if str(keyword) in possible_typos:
+                    st.markdown(f"- {keyword} *(possible typo of '{possible_typos[str(keyword)]}' in your resume)*")
+                else:
+                    st.markdown(f"- {keyword}")
+            
+            found_keywords = response_dict.get('FoundKeywords') or []
+            if found_keywords:
+                with st.expander(f"✅ {len(found_keywords)} reported keyword(s) already in your resume"):
+                    for item in found_keywords:
+                        st.markdown(f"- **{item['keyword']}** — found as `{item['evidence']}`")
+            
+            if st.session_state.jd_requirements:
+                show_keyword_evidence(st.session_state.resume_text, st.session_state.job_description,
+                                      st.session_state.jd_requirements)
             
             st.subheader("📋 Profile Summary")
             st.info(response_dict['Profile Summary'])
@@ -289,85 +847,21 @@ def show_main_application():
 
     elif page == "Advanced Analysis":
         from advanced_analysis import show_advanced_analysis_page
-        show_advanced_analysis_page()
+        show_advanced_analysis_page(reanalyze=run_analysis)
+
+    elif page == "Candidate Matching":
+        from matching import show_matching_page
+        show_matching_page()
+
+    elif page == "Resume Inbox":
+        from ingest_daemon import show_ingestion_page
+        show_ingestion_page()
 
     elif page == "Resume Templates":
         st.title("📝 Professional Resume Templates")
         st.markdown("Choose from industry-specific, ATS-optimized resume templates.")
         
-        from resume_templates import ResumeTemplates
-        template_manager = ResumeTemplates()
-        
-        # Show template selector
-        template_content, template_key = template_manager.show_template_selector()
-        
-        # Additional template features
-        st.markdown("---")
-        
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            st.subheader("📊 Template Statistics")
-            st.info(f"""
-            **Selected Template**: {template_key.title()}
-            **ATS Compatibility**: ✅ Optimized
-            **Industry Focus**: {template_key.title()}
-            **Best For**: {template_key.replace('_', ' ').title()} roles
-            """)
-        
-        with col2:
-            st.subheader("🎯 Quick Actions")
-            if st.button("📋 Use This Template"):
-                st.success("Template ready! Copy the content above and customize it with your information.")
-            
-            if st.button("🔄 Try Another Template"):
-                st.rerun()
-        
-        # Template customization tips
-        st.markdown("---")
-        st.subheader("💡 Template Customization Tips")
-        
-        tips = {
-            'professional': [
-                "Use action verbs to start each bullet point",
-                "Include quantifiable achievements with numbers",
-                "Keep formatting consistent and clean",
-                "Use standard section headers for ATS compatibility",
-                "Tailor content to match job requirements"
-            ],
-            'technical': [
-                "List technologies with proficiency levels",
-                "Include specific project details and results",
-                "Highlight technical achievements and innovations",
-                "Use industry-standard terminology",
-                "Include links to GitHub, portfolio, or demos"
-            ],
-            'executive': [
-                "Focus on leadership and strategic achievements",
-                "Include quantifiable business impact",
-                "Highlight team management and budget responsibility",
-                "Emphasize financial and operational results",
-                "Include board memberships and professional affiliations"
-            ],
-            'entry_level': [
-                "Emphasize relevant coursework and academic projects",
-                "Include internships, volunteer work, and part-time jobs",
-                "Highlight transferable skills and achievements",
-                "Show enthusiasm and motivation for the role",
-                "Include academic achievements if strong (GPA, honors)"
-            ],
-            'creative': [
-                "Include portfolio links and creative samples",
-                "Highlight creative achievements and client work",
-                "Show range of creative skills and disciplines",
-                "Include specific projects with results",
-                "Emphasize innovation and creative problem-solving"
-            ]
-        }
-        
-        template_tips = tips.get(template_key, tips['professional'])
-        for i, tip in enumerate(template_tips, 1):
-            st.markdown(f"{i}. {tip}")
+        show_template_workspace()
 
     elif page == "Resume Improvement Tips":
         st.title("Resume Improvement Tips")
@@ -420,26 +914,25 @@ def show_main_application():
                 st.markdown(f"- `{keyword}`")
                 
             # Generate improvement prompt
-            improvement_prompt = f"""
-            Based on the following analysis:
-            - Current Match: {results['JD Match']}
-            - Missing Keywords: {', '.join(results['MissingKeywords'])}
-            - Current Profile: {results['Profile Summary']}
-
-            Provide specific suggestions for improving the resume, including:
-            1. How to incorporate the missing keywords naturally
-            2. Sample achievement statements
-            3. Skills section improvements
-            4. Overall structure suggestions
-
-            Format the response in clear sections with bullet points.
-            """
+            improvement_prompt = build_improvement_prompt(results)
+            
+            if results.get('Improvement Plan'):
+                st.info("✅ A detailed improvement plan was generated with your analysis. See 'Detailed Improvement Plan'.")
             
             if st.button("Generate Detailed Improvement Plan", type="primary"):
-                with st.spinner("Generating improvement suggestions..."):
-                    suggestions = get_cohere_response(improvement_prompt)
-                    st.session_state.detailed_improvement_plan = suggestions
-                    st.success("Detailed improvement plan generated! Navigate to 'Detailed Improvement Plan' to view it.")
+                st.session_state.improvement_plan_job = get_job_runner().submit(
+                    'improvement_plan', get_cohere_response, improvement_prompt,
+                    user_id=user['id'], priority=INTERACTIVE
+                )
+            
+            if st.session_state.get('improvement_plan_job'):
+                job = show_job_status(st.session_state.improvement_plan_job, "Improvement plan generation")
+                if job is not None:
+                    # Failed and cancelled jobs are cleared too, so their status is shown only once
+                    st.session_state.improvement_plan_job = None
+                    if job['status'] == 'done':
+                        st.session_state.detailed_improvement_plan = job['result']
+                        st.success("Detailed improvement plan generated! Navigate to 'Detailed Improvement Plan' to view it.")
                     
             st.markdown("---")
             
@@ -470,7 +963,11 @@ def show_main_application():
     elif page == "Detailed Improvement Plan":
         st.title("📈 Detailed Improvement Plan")
         
-        if st.session_state.detailed_improvement_plan is None:
+        if st.session_state.detailed_improvement_plan is None and st.session_state.get('improvement_plan_job'):
+            # Finished jobs were collected above, so a job returned here failed or was cancelled
+            if show_job_status(st.session_state.improvement_plan_job, "Improvement plan generation") is not None:
+                st.session_state.improvement_plan_job = None
+        elif st.session_state.detailed_improvement_plan is None:
             st.warning("⚠️ Please generate a detailed improvement plan first in the Resume Improvement Tips page.")
             st.markdown("Go to 'Resume Improvement Tips' and click 'Generate Detailed Improvement Plan' to get started.")
         else:
@@ -482,9 +979,13 @@ def show_main_application():
 
     elif page == "User Profile":
         auth_manager.show_user_profile()
+        st.markdown("---")
+        from analysis_export import show_export_section
+        show_export_section(st.session_state.user['id'])
 
 def main():
     """Main application function"""
+    start = time.perf_counter()
     # Set page config
     st.set_page_config(
         page_title="Smart Resume ATS",
@@ -493,11 +994,15 @@ def main():
         initial_sidebar_state="expanded"
     )
     
-    # Check authentication status
-    if not auth_manager.is_authenticated():
-        show_authentication_page()
-    else:
-        show_main_application()
+    try:
+        # Check authentication status
+        if not auth_manager.is_authenticated():
+            show_authentication_page()
+        else:
+            show_main_application()
+    finally:
+        # Fragment reruns skip main(), so these timings cover full script runs only
+        record_run("Full script run", time.perf_counter() - start)
 
 if __name__ == "__main__":
     main()
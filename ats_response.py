@@ -0,0 +1,88 @@
+import json
+import re
+
+REQUIRED_KEYS = ['JD Match', 'MissingKeywords', 'Profile Summary']
+
+
+def parse_json_response(response):
+    """Parse a JSON object out of an LLM response, tolerating code fences and surrounding text
+
+    Returns the parsed dict, or None if no JSON object could be recovered.
+    """
+    response = response.replace('\n', ' ').strip()
+    if response.startswith("```json"):
+        response = response[7:]
+    if response.endswith("```"):
+        response = response[:-3]
+    response = response.strip()
+
+    try:
+        return json.loads(response)
+    except json.JSONDecodeError:
+        pass
+
+    # Try multiple patterns to extract JSON
+    json_patterns = [
+        r'\{.*\}',
+        r'\{[^}]*"JD Match"[^}]*\}',
+        r'\{[^}]*"MissingKeywords"[^}]*\}',
+        r'\{[^}]*"Profile Summary"[^}]*\}'
+    ]
+    for pattern in json_patterns:
+        json_match = re.search(pattern, response, re.DOTALL)
+        if json_match:
+            try:
+                return json.loads(json_match.group())
+            except json.JSONDecodeError:
+                continue
+    return None
+
+
+def normalize_analysis(response_dict):
+    """Validate an analysis dict and coerce loosely-typed fields
+
+    Returns the dict, or None if any of the required keys is missing.
+    """
+    if not isinstance(response_dict, dict):
+        return None
+
+    # Handle Profile Summary if it's an array instead of string
+    if 'Profile Summary' in response_dict and isinstance(response_dict['Profile Summary'], list):
+        response_dict['Profile Summary'] = ' '.join(response_dict['Profile Summary'])
+
+    if not all(key in response_dict for key in REQUIRED_KEYS):
+        return None
+    return response_dict
+
+
+def normalize_improvement_plan(plan):
+    """Coerce an 'Improvement Plan' value into a dict of section name -> list of strings
+
+    Returns None if the plan is missing or empty.
+    """
+    if isinstance(plan, str):
+        plan = {'Recommendations': [plan]}
+    elif isinstance(plan, list):
+        plan = {'Recommendations': plan}
+    if not isinstance(plan, dict):
+        return None
+
+    normalized = {}
+    for section, items in plan.items():
+        if isinstance(items, str):
+            items = [items]
+        if isinstance(items, list):
+            items = [str(item).strip() for item in items if str(item).strip()]
+            if items:
+                normalized[str(section)] = items
+    return normalized or None
+
+
+def format_improvement_plan(plan):
+    """Render a normalized improvement plan as markdown"""
+    lines = []
+    for section, items in plan.items():
+        lines.append(f"### {section}")
+        lines.extend(f"- {item}" for item in items)
+        lines.append("")
+    return '\n'.join(lines).strip()
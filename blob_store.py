@@ -0,0 +1,336 @@
+import argparse
+import os
+import random
+import sqlite3
+import struct
+import tempfile
+import threading
+import time
+import zlib
+from collections import Counter
+
+try:
+    import zstandard
+except ImportError:
+    # zstandard is in requirements.txt; without it, zlib with a preset dictionary is used
+    zstandard = None
+
+CODEC_ZSTD = 1
+CODEC_ZLIB = 2
+CODEC_NAMES = {CODEC_ZSTD: 'zstd', CODEC_ZLIB: 'zlib'}
+
+# Codec byte followed by the id of the dictionary the blob was compressed with (0 for none)
+_HEADER = struct.Struct('>BI')
+
+ZSTD_LEVEL = 9
+ZLIB_LEVEL = 9
+ZSTD_DICTIONARY_SIZE = 64 * 1024
+# zlib only looks back 32 KB, so a larger preset dictionary is never used
+ZLIB_DICTIONARY_SIZE = 32 * 1024
+# Shorter texts stay plain TEXT; the header and codec framing would outweigh the savings
+MIN_COMPRESS_CHARS = 128
+
+
+def build_zlib_dictionary(samples, size=ZLIB_DICTIONARY_SIZE):
+    """Build a zlib preset dictionary from the lines and words common to many samples
+
+    zlib matches against the end of the dictionary most cheaply, so the most
+    frequent content is placed last.
+    """
+    line_counts, word_counts = Counter(), Counter()
+    for sample in samples:
+        line_counts.update({line.strip() for line in sample.splitlines() if len(line.strip()) > 3})
+        word_counts.update({word for word in sample.split() if len(word) > 3})
+
+    pieces, total = [], 0
+    common = [line for line, count in line_counts.most_common() if count > 1]
+    common += [word for word, count in word_counts.most_common() if count > 1]
+    for piece in common:
+        encoded = (piece + '\n').encode()
+        if total + len(encoded) > size:
+            break
+        pieces.append(encoded)
+        total += len(encoded)
+    return b''.join(reversed(pieces))
+
+
+class BlobStore:
+    """Compress long texts into SQLite blobs, with dictionaries trained on stored documents
+
+    pack() turns a text into a compressed blob (zstd when the zstandard package is
+    installed, zlib otherwise) using the most recent dictionary for that codec;
+    unpack() accepts either a blob or a plain string, so columns holding rows
+    written before compression was introduced keep working. Every blob records the
+    dictionary it was compressed with, and dictionaries are never deleted, so
+    training a new one does not invalidate existing rows.
+    """
+
+    def __init__(self, db_path="users.db", codec=None):
+        self.db_path = db_path
+        self.codec = codec or (CODEC_ZSTD if zstandard is not None else CODEC_ZLIB)
+        self.dictionaries = {}
+        self.active_dictionary = 0
+        self.lock = threading.Lock()
+        # zstd (de)compressors are costly to set up with a dictionary and not thread-safe
+        self.local = threading.local()
+        self.init_database()
+        self._load_dictionaries()
+
+    def init_database(self):
+        """Create the compression dictionary table if it doesn't exist"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS compression_dictionaries (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                codec INTEGER NOT NULL,
+                dictionary BLOB NOT NULL,
+                sample_count INTEGER,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+        conn.commit()
+        conn.close()
+
+    def _load_dictionaries(self):
+        """Load every stored dictionary and pick the newest one for this codec"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            rows = conn.execute('SELECT id, codec, dictionary FROM compression_dictionaries ORDER BY id').fetchall()
+        finally:
+            conn.close()
+
+        with self.lock:
+            for dictionary_id, codec, data in rows:
+                if dictionary_id not in self.dictionaries:
+                    self.dictionaries[dictionary_id] = (codec, self._prepare(codec, data))
+                if codec == self.codec:
+                    self.active_dictionary = dictionary_id
+
+    def _prepare(self, codec, data):
+        """Turn stored dictionary bytes into the form the codec uses"""
+        if codec == CODEC_ZSTD and zstandard is not None:
+            return zstandard.ZstdCompressionDict(data)
+        return data
+
+    def _dictionary(self, dictionary_id, codec):
+        """Return a dictionary by id, reloading when another process trained it"""
+        if dictionary_id == 0:
+            return None
+        if dictionary_id not in self.dictionaries:
+            self._load_dictionaries()
+        stored_codec, dictionary = self.dictionaries[dictionary_id]
+        if stored_codec != codec:
+            raise ValueError(f"Dictionary {dictionary_id} is not a {CODEC_NAMES[codec]} dictionary")
+        return dictionary
+
+    def _zstd(self, kind, dictionary_id):
+        """Return this thread's zstd compressor or decompressor for a dictionary"""
+        cache = getattr(self.local, 'zstd', None)
+        if cache is None:
+            cache = self.local.zstd = {}
+        worker = cache.get((kind, dictionary_id))
+        if worker is None:
+            dictionary = self._dictionary(dictionary_id, CODEC_ZSTD)
+            if kind == 'compress':
+                worker = zstandard.ZstdCompressor(level=ZSTD_LEVEL, dict_data=dictionary)
+            else:
+                worker = zstandard.ZstdDecompressor(dict_data=dictionary)
+            cache[(kind, dictionary_id)] = worker
+        return worker
+
+    def compress(self, data, codec, dictionary_id=0):
+        """Compress bytes with a codec and dictionary, returning the framed blob"""
+        if codec == CODEC_ZSTD:
+            if zstandard is None:
+                raise RuntimeError("zstd compression requires the zstandard package (pip install zstandard)")
+            body = self._zstd('compress', dictionary_id).compress(data)
+        else:
+            dictionary = self._dictionary(dictionary_id, codec)
+            compressor = zlib.compressobj(ZLIB_LEVEL, zdict=dictionary) if dictionary else zlib.compressobj(ZLIB_LEVEL)
+            body = compressor.compress(data) + compressor.flush()
+        return _HEADER.pack(codec, dictionary_id) + body
+
+    def decompress(self, blob):
+        """Decompress a framed blob back to bytes"""
+        codec, dictionary_id = _HEADER.unpack_from(blob)
+        body = memoryview(blob)[_HEADER.size:]
+        if codec == CODEC_ZSTD:
+            if zstandard is None:
+                raise RuntimeError("This blob is zstd-compressed; install the zstandard package to read it")
+            return self._zstd('decompress', dictionary_id).decompress(body)
+        if codec == CODEC_ZLIB:
+            dictionary = self._dictionary(dictionary_id, codec)
+            decompressor = zlib.decompressobj(zdict=dictionary) if dictionary else zlib.decompressobj()
+            return decompressor.decompress(body) + decompressor.flush()
+        raise ValueError(f"Unknown blob codec {codec}")
+
+    def pack(self, text):
+        """Return the value to store for a text: a compressed blob, or the text itself if that is smaller"""
+        if text is None or len(text) < MIN_COMPRESS_CHARS:
+            return text
+        data = text.encode('utf-8')
+        blob = self.compress(data, self.codec, self.active_dictionary)
+        return blob if len(blob) < len(data) else text
+
+    def unpack(self, value):
+        """Return the text of a stored value, whether it was packed or stored as plain TEXT"""
+        if value is None or isinstance(value, str):
+            return value
+        return self.decompress(bytes(value)).decode('utf-8')
+
+    def train(self, samples, size=None):
+        """Train a dictionary for this store's codec from sample texts; returns its id"""
+        samples = [sample for sample in samples if sample]
+        if self.codec == CODEC_ZSTD:
+            size = size or ZSTD_DICTIONARY_SIZE
+            data = zstandard.train_dictionary(size, [sample.encode('utf-8') for sample in samples]).as_bytes()
+        else:
+            data = build_zlib_dictionary(samples, size or ZLIB_DICTIONARY_SIZE)
+
+        conn = sqlite3.connect(self.db_path)
+        try:
+            cursor = conn.execute('''
+                INSERT INTO compression_dictionaries (codec, dictionary, sample_count) VALUES (?, ?, ?)
+            ''', (self.codec, data, len(samples)))
+            conn.commit()
+            dictionary_id = cursor.lastrowid
+        finally:
+            conn.close()
+        self._load_dictionaries()
+        return dictionary_id
+
+
+_blob_stores = {}
+_blob_stores_lock = threading.Lock()
+
+
+def get_blob_store(db_path="users.db"):
+    """Return the process-wide blob store for a database"""
+    with _blob_stores_lock:
+        if db_path not in _blob_stores:
+            _blob_stores[db_path] = BlobStore(db_path)
+        return _blob_stores[db_path]
+
+
+def load_samples(db_path, limit=2000):
+    """Collect stored resumes, job descriptions and generated outputs as training samples"""
+    store = get_blob_store(db_path)
+    queries = [
+        'SELECT resume_text FROM analyses ORDER BY id DESC LIMIT ?',
+        'SELECT job_description FROM analyses ORDER BY id DESC LIMIT ?',
+        'SELECT jd_text FROM job_descriptions ORDER BY id DESC LIMIT ?',
+        "SELECT result FROM llm_jobs WHERE status = 'done' ORDER BY created_at DESC LIMIT ?",
+    ]
+    samples = set()
+    conn = sqlite3.connect(db_path)
+    try:
+        for query in queries:
+            try:
+                rows = conn.execute(query, (limit,)).fetchall()
+            except sqlite3.OperationalError:
+                # The table has not been created in this database yet
+                continue
+            samples.update(store.unpack(row[0]) for row in rows if row[0])
+    finally:
+        conn.close()
+    return sorted(samples)
+
+
+def benchmark(samples, reads=2000):
+    """Compare stored size and read latency of plain TEXT against each available codec
+
+    A fifth of the samples is held out; dictionaries are trained on the rest and
+    every variant is measured on the held-out texts only, read back from SQLite.
+    """
+    samples = list(samples)
+    random.Random(0).shuffle(samples)
+    held_out = max(1, len(samples) // 5)
+    test, train = samples[:held_out], samples[held_out:] or samples
+
+    variants = [('plain', None, False), ('zlib', CODEC_ZLIB, False), ('zlib+dict', CODEC_ZLIB, True)]
+    if zstandard is not None:
+        variants += [('zstd', CODEC_ZSTD, False), ('zstd+dict', CODEC_ZSTD, True)]
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for name, codec, use_dictionary in variants:
+            db_path = os.path.join(directory, f'{name}.db')
+            store = None
+            if codec is not None:
+                store = BlobStore(db_path, codec)
+                if use_dictionary:
+                    store.train(train)
+
+            started = time.perf_counter()
+            values = [text if store is None else store.pack(text) for text in test]
+            write_seconds = time.perf_counter() - started
+
+            conn = sqlite3.connect(db_path)
+            try:
+                conn.execute('CREATE TABLE docs (id INTEGER PRIMARY KEY, body)')
+                conn.executemany('INSERT INTO docs (id, body) VALUES (?, ?)', enumerate(values))
+                conn.commit()
+                stored_bytes = sum(len(value) if isinstance(value, bytes) else len(value.encode('utf-8'))
+                                   for value in values)
+
+                reader = random.Random(1)
+                ids = [reader.randrange(len(test)) for _ in range(reads)]
+                started = time.perf_counter()
+                for doc_id in ids:
+                    value = conn.execute('SELECT body FROM docs WHERE id = ?', (doc_id,)).fetchone()[0]
+                    if store is not None:
+                        store.unpack(value)
+                read_seconds = time.perf_counter() - started
+            finally:
+                conn.close()
+
+            results.append({
+                'variant': name,
+                'stored_bytes': stored_bytes,
+                'write_us': write_seconds / len(test) * 1e6,
+                'read_us': read_seconds / reads * 1e6
+            })
+
+    plain_bytes = results[0]['stored_bytes']
+    for result in results:
+        result['ratio'] = plain_bytes / result['stored_bytes'] if result['stored_bytes'] else 0.0
+    return results
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Train compression dictionaries and benchmark blob storage")
+    parser.add_argument("--db", default="users.db", help="SQLite database holding the stored documents")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("train", help="Train a dictionary from the documents stored in the database")
+    benchmark_parser = subparsers.add_parser("benchmark", help="Compare size and read latency of each codec")
+    benchmark_parser.add_argument("--documents", help="Directory of .pdf/.txt documents to use instead of the database")
+    benchmark_parser.add_argument("--reads", type=int, default=2000, help="Number of random reads timed per codec")
+    args = parser.parse_args()
+
+    if args.command == "benchmark" and args.documents:
+        from matching import iter_documents
+        samples = [text for _, text in iter_documents(args.documents) if text]
+    else:
+        samples = load_samples(args.db)
+    if len(samples) < 10:
+        parser.error(f"need at least 10 documents, found {len(samples)}")
+
+    if args.command == "train":
+        store = get_blob_store(args.db)
+        dictionary_id = store.train(samples)
+        print(f"Trained {CODEC_NAMES[store.codec]} dictionary #{dictionary_id} from {len(samples)} documents.")
+        return
+
+    print(f"{len(samples)} documents; zstandard {'available' if zstandard is not None else 'not installed'}")
+    print(f"{'variant':<10} {'bytes':>12} {'ratio':>7} {'write µs':>10} {'read µs':>9}")
+    for result in benchmark(samples, args.reads):
+        print(f"{result['variant']:<10} {result['stored_bytes']:>12,} {result['ratio']:>6.2f}x "
+              f"{result['write_us']:>10.1f} {result['read_us']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+import argparse
+import os
+import threading
+import time
+import zlib
+import numpy as np
+from matching import MatchingEngine, load_documents
+from vector_store import VectorStore
+
+VECTOR_DIM = 256
+DEFAULT_INDEX_DIR = "candidate_index"
+
+# Below this many vectors a flat scan is fast enough and k-means has too little data
+TRAIN_THRESHOLD = 1024
+# Retrain once the index has grown this many times beyond the size it was trained on
+RETRAIN_GROWTH = 4
+KMEANS_ITERATIONS = 10
+KMEANS_SAMPLE_PER_LIST = 256
+
+_term_counter = MatchingEngine()
+
+
+def embed_text(text, dim=VECTOR_DIM, skill_weight=2.0):
+    """Embed a document as a unit vector of signed, hashed term features
+
+    Uses the same terms as the matching engine (words plus 'skill:' features) with
+    sublinear tf. Hashing keeps vectors stable as the pool grows, so they can be
+    computed once at extraction time and never need refitting.
+    """
+    vector = np.zeros(dim, dtype=np.float32)
+    for term, count in _term_counter.document_terms(text).items():
+        hashed = zlib.crc32(term.encode())
+        weight = (1.0 + np.log(count)) * (skill_weight if term.startswith('skill:') else 1.0)
+        vector[hashed % dim] += weight if hashed & 0x80000000 else -weight
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class IVFIndex:
+    """Inverted-file index for approximate cosine search over unit vectors
+
+    Vectors are clustered with spherical k-means; a query only scans the vectors of
+    the nprobe clusters whose centroids are closest to it. Vectors live in a
+    memory-mapped VectorStore, so only the scanned rows are paged in, and inserts
+    made by other processes are picked up on the next query. New vectors are
+    assigned to their nearest cluster immediately; the clustering is retrained when
+    the index has grown well beyond the size it was trained on.
+
+    Files in the index directory:
+      vectors.f32 / ids.jsonl - the vector store (rows and their {"id", "label"})
+      ivf.npz                 - centroids and the cluster of each row at training time
+    """
+
+    def __init__(self, directory=DEFAULT_INDEX_DIR, dim=VECTOR_DIM, nprobe=8):
+        self.directory = directory
+        self.dim = dim
+        self.nprobe = nprobe
+        self.store = VectorStore(directory, dim, ids_name='ids')
+        self.ivf_path = os.path.join(directory, 'ivf.npz')
+        self.ivf_mtime = None
+        self.centroids = None
+        self.assignments = np.zeros(0, dtype=np.int32)
+        self.lists = []
+        self.trained_count = 0
+        self.lock = threading.Lock()
+        self._sync()
+
+    def _sync(self):
+        """Catch up with rows and clusterings written by this or other processes"""
+        self.store.refresh()
+        mtime = os.path.getmtime(self.ivf_path) if os.path.exists(self.ivf_path) else None
+        if mtime != self.ivf_mtime:
+            self.ivf_mtime = mtime
+            self._load_clustering()
+
+        # Rows added since the clustering was saved are assigned to their nearest cluster
+        count = len(self.store)
+        if self.centroids is not None and len(self.assignments) < count:
+            vectors = self.store.matrix()
+            new_rows = np.arange(len(self.assignments), count)
+            nearest = self._nearest_centroids(vectors[len(self.assignments):count])
+            self.assignments = np.concatenate([self.assignments, nearest])
+            for row, cluster in zip(new_rows, nearest):
+                self.lists[cluster].append(row)
+
+    def _load_clustering(self):
+        """Load the centroids and row assignments saved by the last training"""
+        self.centroids = None
+        self.assignments = np.zeros(0, dtype=np.int32)
+        self.lists = []
+        self.trained_count = 0
+        if self.ivf_mtime is None:
+            return
+        with np.load(self.ivf_path) as saved:
+            self.centroids = saved['centroids']
+            self.assignments = saved['assignments'][:len(self.store)].astype(np.int32)
+        self.trained_count = len(self.assignments)
+        self._rebuild_lists()
+
+    def _nearest_centroids(self, rows, batch_size=8192):
+        """Return the index of the closest centroid for each row"""
+        nearest = np.empty(len(rows), dtype=np.int32)
+        for start in range(0, len(rows), batch_size):
+            nearest[start:start + batch_size] = np.argmax(rows[start:start + batch_size] @ self.centroids.T, axis=1)
+        return nearest
+
+    def _rebuild_lists(self):
+        """Group row numbers by cluster"""
+        order = np.argsort(self.assignments, kind='stable')
+        bounds = np.searchsorted(self.assignments[order], np.arange(len(self.centroids) + 1))
+        self.lists = [list(order[bounds[i]:bounds[i + 1]]) for i in range(len(self.centroids))]
+
+    def train(self):
+        """Cluster the current vectors with spherical k-means and persist the clustering"""
+        data = self.store.matrix()
+        count = len(data)
+        nlist = max(1, min(4096, int(np.sqrt(count))))
+        random = np.random.RandomState(0)
+        sample_size = min(count, nlist * KMEANS_SAMPLE_PER_LIST)
+        sample = np.asarray(data[np.sort(random.choice(count, sample_size, replace=False))])
+
+        centroids = sample[random.choice(sample_size, nlist, replace=False)].copy()
+        for _ in range(KMEANS_ITERATIONS):
+            nearest = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, nearest, sample)
+            norms = np.linalg.norm(sums, axis=1)
+            # Empty clusters keep their previous centroid
+            filled = norms > 0
+            centroids[filled] = sums[filled] / norms[filled, None]
+
+        self.centroids = centroids
+        self.assignments = self._nearest_centroids(data)
+        self.trained_count = count
+        self._rebuild_lists()
+        # Write then rename so readers in other processes never load a partial file
+        temporary_path = self.ivf_path + '.tmp.npz'
+        np.savez(temporary_path, centroids=self.centroids, assignments=self.assignments)
+        os.replace(temporary_path, self.ivf_path)
+        self.ivf_mtime = os.path.getmtime(self.ivf_path)
+
+    def add(self, doc_id, vector, label=''):
+        """Insert a vector; returns False if the id is already indexed"""
+        with self.lock:
+            if self.store.append(doc_id, vector, {'label': label}) is None:
+                return False
+            self._sync()
+
+            count = len(self.store)
+            if self.centroids is None:
+                if count >= TRAIN_THRESHOLD:
+                    self.train()
+            elif count >= RETRAIN_GROWTH * self.trained_count:
+                self.train()
+            return True
+
+    def search(self, query_vector, k=10, nprobe=None):
+        """Return the k most similar (id, label, score) entries, most similar first"""
+        query = np.asarray(query_vector, dtype=np.float32).reshape(self.dim)
+        with self.lock:
+            self._sync()
+            vectors = self.store.matrix()
+            if len(vectors) == 0:
+                return []
+            if self.centroids is None:
+                rows = np.arange(len(vectors))
+                scores = vectors @ query
+            else:
+                nprobe = min(nprobe or self.nprobe, len(self.centroids))
+                probed = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+                rows = np.sort(np.fromiter((row for cluster in probed for row in self.lists[cluster]), dtype=np.int64))
+                if len(rows) == 0:
+                    return []
+                scores = vectors[rows] @ query
+            k = min(k, len(rows))
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top], kind='stable')]
+            return [(self.store.ids[rows[i]], self.store.metadata[rows[i]].get('label', ''), float(scores[i]))
+                    for i in top]
+
+    def __len__(self):
+        return len(self.store)
+
+
+_candidate_index = None
+_candidate_index_lock = threading.Lock()
+
+
+def get_candidate_index():
+    """Return the process-wide candidate index"""
+    global _candidate_index
+    with _candidate_index_lock:
+        if _candidate_index is None:
+            _candidate_index = IVFIndex(os.getenv("CANDIDATE_INDEX_DIR", DEFAULT_INDEX_DIR))
+        return _candidate_index
+
+
+def index_resume(doc_id, resume_text, label=''):
+    """Embed a resume and add it to the candidate index"""
+    return get_candidate_index().add(doc_id, embed_text(resume_text), label)
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Build and query the candidate similarity index")
+    parser.add_argument("--index-dir", default=DEFAULT_INDEX_DIR, help="Directory holding the index files")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    add_parser = subparsers.add_parser("add", help="Index every resume in a directory")
+    add_parser.add_argument("resumes", help="Directory of resume .pdf/.txt files")
+    query_parser = subparsers.add_parser("query", help="Find the resumes most similar to a job description")
+    query_parser.add_argument("jd", help="Job description .txt file")
+    query_parser.add_argument("--top-k", type=int, default=10, help="Number of candidates to return")
+    query_parser.add_argument("--nprobe", type=int, help="Number of clusters to scan")
+    args = parser.parse_args()
+
+    index = IVFIndex(args.index_dir)
+    if args.command == "add":
+        from resume_model import hash_resume
+        added = sum(index.add(hash_resume(text), embed_text(text), name)
+                    for name, text in load_documents(args.resumes).items())
+        print(f"Indexed {added} new resume(s); the index now holds {len(index)}.")
+    else:
+        with open(args.jd, encoding='utf-8') as f:
+            query = embed_text(f.read())
+        started = time.perf_counter()
+        results = index.search(query, args.top_k, args.nprobe)
+        elapsed = (time.perf_counter() - started) * 1000
+        for doc_id, label, score in results:
+            print(f"{score:.3f}  {label or doc_id}")
+        print(f"({len(index)} indexed, {elapsed:.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
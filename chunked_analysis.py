@@ -0,0 +1,291 @@
+import sqlite3
+import hashlib
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor
+from ats_response import parse_json_response
+from llm_scheduler import current_request_context, request_context
+from resume_model import SECTION_PATTERNS
+
+# Bump when the map prompt changes so cached chunk results are not reused
+CHUNK_PROMPT_VERSION = 1
+
+# Documents longer than this (resume + JD characters) are analyzed in chunks
+LONG_DOCUMENT_CHARS = 12000
+MAX_CHUNK_CHARS = 3500
+
+chunk_prompt = """
+You are a skilled ATS (Application Tracking System). Below is ONE PART of a longer resume and ONE PART of a job description.
+
+Resume Part ({section}): {chunk}
+Job Description Part: {jd}
+
+Evaluate only this resume part against this job description part and provide your response in the following JSON format ONLY:
+
+{{
+    "Relevance": "70%",
+    "MatchedKeywords": ["keyword from the job description found in this resume part"],
+    "MissingKeywords": ["keyword from the job description not found in this resume part"],
+    "Summary": "One or two sentences about what this resume part shows that is relevant to the job."
+}}
+
+Important:
+- Relevance should be a percentage as a string (e.g., "70%")
+- Keywords must come from the job description part
+- Return ONLY the JSON object, no additional text or formatting
+"""
+
+summary_prompt = """
+Combine the following notes about different parts of one candidate's resume into a single comprehensive profile summary of the candidate's skills and experience relevant to the job. Return only the summary as one paragraph.
+
+Notes:
+{notes}
+"""
+
+
+def split_text(text, max_chars=MAX_CHUNK_CHARS):
+    """Split text into chunks of at most max_chars, breaking on paragraph and line boundaries"""
+    chunks, current = [], ''
+    for block in re.split(r'\n\s*\n|\n', text):
+        block = block.strip()
+        if not block:
+            continue
+        while len(block) > max_chars:
+            if current:
+                chunks.append(current)
+                current = ''
+            chunks.append(block[:max_chars])
+            block = block[max_chars:]
+        if current and len(current) + len(block) + 1 > max_chars:
+            chunks.append(current)
+            current = ''
+        current = f"{current}\n{block}" if current else block
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def split_resume(resume_text, sections):
+    """Split a resume into (section name, chunk) pairs using its extracted sections
+
+    Text outside every detected section, apart from the section headers, goes into
+    'other' chunks so it is still analyzed. Falls back to plain windows when the
+    detected sections cover too little of the text.
+    """
+    named = [(name, content) for name, content in sections.items() if name != 'contact_info' and content]
+    covered = sum(len(content) for _, content in named)
+    if covered < len(resume_text) * 0.5:
+        return [('resume', chunk) for chunk in split_text(resume_text)]
+    chunks = [(name, chunk) for name, content in named for chunk in split_text(content)]
+    other = uncovered_text(resume_text, [content for _, content in named])
+    return chunks + [('other', chunk) for chunk in split_text(other)]
+
+
+def uncovered_text(resume_text, contents):
+    """Return the lines of a resume that are in none of the section contents and are not section headers"""
+    covered = [False] * (len(resume_text) + 1)
+    for content in contents:
+        start = resume_text.find(content)
+        if start >= 0:
+            covered[start:start + len(content)] = [True] * len(content)
+
+    lines, line = [], ''
+    for char, is_covered in zip(resume_text + '\n', covered):
+        if char == '\n':
+            lines.append(line)
+            line = ''
+        elif not is_covered:
+            line += char
+    return '\n'.join(line for line in lines if line.strip() and not is_section_header(line))
+
+
+def is_section_header(line):
+    """Check whether a line is only a section header such as 'Experience:'"""
+    line = line.strip()
+    for pattern in SECTION_PATTERNS.values():
+        match = pattern.match(line)
+        if match and not match.group(2):
+            return True
+    return False
+
+
+def diff_sections(previous_sections, sections):
+    """Return the names of sections that were added, removed or edited between two versions"""
+    names = [name for name in sections if name != 'contact_info']
+    names += [name for name in previous_sections if name not in sections and name != 'contact_info']
+    return [name for name in names
+            if (previous_sections.get(name) or '').strip() != (sections.get(name) or '').strip()]
+
+
+def percentage_value(value):
+    """Convert '85%', '85' or 85 into an int between 0 and 100"""
+    digits = re.sub(r'[^0-9]', '', str(value))
+    return min(100, int(digits)) if digits else 0
+
+
+class ChunkedAnalyzer:
+    """Map-reduce analysis for resumes and job descriptions too long for a single prompt
+
+    Each resume chunk is scored against each JD chunk on one shared thread pool, so
+    at most max_workers calls are in flight; results are cached per chunk in SQLite and
+    reduced into the usual 'JD Match' / 'MissingKeywords' / 'Profile Summary' dict.
+    """
+
+    def __init__(self, generate, db_path="users.db", max_workers=4):
+        self.generate = generate
+        self.db_path = db_path
+        self.max_workers = max_workers
+        # One pool for every analysis instead of a new one per call
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="chunk")
+        self.init_database()
+
+    def init_database(self):
+        """Create the chunk result cache table if it doesn't exist"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS chunk_results (
+                chunk_hash TEXT PRIMARY KEY,
+                result TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+        conn.commit()
+        conn.close()
+
+    def _cache_get(self, chunk_hash):
+        """Return the cached result for a chunk, or None"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            row = conn.execute('SELECT result FROM chunk_results WHERE chunk_hash = ?', (chunk_hash,)).fetchone()
+            return json.loads(row[0]) if row else None
+        finally:
+            conn.close()
+
+    def _cache_put(self, chunk_hash, result):
+        """Store the result for a chunk"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            conn.execute('INSERT OR REPLACE INTO chunk_results (chunk_hash, result) VALUES (?, ?)',
+                         (chunk_hash, json.dumps(result)))
+            conn.commit()
+        finally:
+            conn.close()
+
+    def chunk_hash(self, section, chunk, jd_chunk):
+        """Cache key of one resume chunk scored against one JD chunk"""
+        return hashlib.sha256(
+            f"{CHUNK_PROMPT_VERSION}\x00{section}\x00{chunk}\x00{jd_chunk}".encode()
+        ).hexdigest()
+
+    def analyze_chunk(self, section, chunk, jd_chunk):
+        """Score one resume chunk against one JD chunk, using the cache when possible"""
+        chunk_hash = self.chunk_hash(section, chunk, jd_chunk)
+        cached = self._cache_get(chunk_hash)
+        if cached is not None:
+            return cached
+
+        response = self.generate(chunk_prompt.format(section=section, chunk=chunk, jd=jd_chunk), max_tokens=400)
+        parsed = parse_json_response(response) or {}
+        result = {
+            'section': section,
+            'relevance': percentage_value(parsed.get('Relevance', 0)),
+            'matched': [str(k) for k in parsed.get('MatchedKeywords', []) if k],
+            'missing': [str(k) for k in parsed.get('MissingKeywords', []) if k],
+            'summary': str(parsed.get('Summary', '')).strip()
+        }
+        # Unparseable responses are not cached so they are retried next time
+        if parsed:
+            self._cache_put(chunk_hash, result)
+        return result
+
+    def map_chunks(self, tasks):
+        """Run analyze_chunk over (section, chunk, jd_chunk) tasks with bounded concurrency"""
+        # Worker threads inherit the caller's user and priority for admission control
+        user_id, priority = current_request_context()
+
+        def run(task):
+            with request_context(user_id, priority):
+                return self.analyze_chunk(*task)
+
+        return list(self.executor.map(run, tasks))
+
+    def reduce_results(self, results, jd_chunk_count):
+        """Merge per-chunk results into the standard analysis schema"""
+        matched = {}
+        for result in results:
+            for keyword in result['matched']:
+                matched.setdefault(keyword.lower(), keyword)
+
+        # A keyword is missing only if no resume chunk matched it
+        missing = {}
+        for result in results:
+            for keyword in result['missing']:
+                if keyword.lower() not in matched:
+                    missing.setdefault(keyword.lower(), keyword)
+
+        if matched or missing:
+            score = round(100 * len(matched) / (len(matched) + len(missing)))
+        else:
+            # Best relevance per resume chunk, averaged
+            per_chunk = [max(r['relevance'] for r in results[i:i + jd_chunk_count])
+                         for i in range(0, len(results), jd_chunk_count)]
+            score = round(sum(per_chunk) / len(per_chunk)) if per_chunk else 0
+
+        notes = [f"{r['section'].title()}: {r['summary']}" for r in results if r['summary']]
+        profile_summary = ' '.join(r['summary'] for r in results if r['summary'])
+        if notes:
+            profile_summary = self.summarize('\n'.join(notes)) or profile_summary
+
+        return {
+            'JD Match': f"{score}%",
+            'MissingKeywords': list(missing.values()),
+            'Profile Summary': profile_summary,
+            'Source': 'chunked'
+        }
+
+    def summarize(self, notes):
+        """Merge the per-chunk notes into one profile summary, cached like chunk results"""
+        summary_hash = hashlib.sha256(f"{CHUNK_PROMPT_VERSION}\x00summary\x00{notes}".encode()).hexdigest()
+        cached = self._cache_get(summary_hash)
+        if cached is not None:
+            return cached
+        try:
+            summary = self.generate(summary_prompt.format(notes=notes), max_tokens=400)
+        except Exception:
+            return None
+        self._cache_put(summary_hash, summary)
+        return summary
+
+    def analyze(self, resume_text, job_description, sections, previous=None):
+        """Analyze a long resume against a (possibly long) job description
+
+        previous, the (sections, job_description) of the last analyzed version, marks
+        this as an incremental re-analysis: results of unchanged section chunks come
+        from the cache, so only edited sections are sent to the LLM, and the result
+        reports what changed.
+        """
+        resume_chunks = split_resume(resume_text, sections)
+        jd_chunks = split_text(job_description) or ['']
+        tasks = [(section, chunk, jd_chunk) for section, chunk in resume_chunks for jd_chunk in jd_chunks]
+        if previous is None:
+            return self.reduce_results(self.map_chunks(tasks), len(jd_chunks))
+
+        previous_sections, previous_job_description = previous
+        reused = sum(1 for task in tasks if self._cache_get(self.chunk_hash(*task)) is not None)
+        result = self.reduce_results(self.map_chunks(tasks), len(jd_chunks))
+        result['Source'] = 'incremental'
+        result['Reanalysis'] = {
+            'changed_sections': diff_sections(previous_sections, sections),
+            'jd_changed': job_description.strip() != previous_job_description.strip(),
+            'reused_chunks': reused,
+            'analyzed_chunks': len(tasks) - reused
+        }
+        return result
+
+
+def needs_chunking(resume_text, job_description):
+    """Check whether the inputs are long enough to warrant chunked analysis"""
+    return len(resume_text) + len(job_description) > LONG_DOCUMENT_CHARS
@@ -0,0 +1,372 @@
+import argparse
+import ctypes
+import ctypes.util
+import hashlib
+import json
+import logging
+import os
+import select
+import signal
+import sqlite3
+import struct
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger("ingest_daemon")
+
+RESUME_EXTENSIONS = ('.pdf',)
+# A file must keep the same size and mtime for this long before it is picked up
+SETTLE_SECONDS = 2.0
+POLL_INTERVAL = 1.0
+TOP_MATCHES = 5
+
+
+class IngestionLog:
+    """SQLite record of every resume picked up from the watched folder"""
+
+    def __init__(self, db_path="users.db"):
+        self.db_path = db_path
+        self.init_database()
+
+    def init_database(self):
+        """Create the ingested resumes table if it doesn't exist"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS ingested_resumes (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                file_name TEXT NOT NULL,
+                file_path TEXT NOT NULL,
+                file_hash TEXT UNIQUE NOT NULL,
+                resume_hash TEXT,
+                status TEXT NOT NULL,
+                error TEXT,
+                matches TEXT,
+                skills TEXT,
+                ingested_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+        conn.commit()
+        conn.close()
+
+    def is_ingested(self, file_hash):
+        """Check whether a file with this content was already processed successfully
+
+        Failed files are not counted, so they are retried the next time they are seen.
+        """
+        conn = sqlite3.connect(self.db_path)
+        try:
+            row = conn.execute("SELECT 1 FROM ingested_resumes WHERE file_hash = ? AND status = 'done'",
+                               (file_hash,)).fetchone()
+            return row is not None
+        finally:
+            conn.close()
+
+    def record(self, file_path, file_hash, status, resume_hash=None, matches=None, skills=None, error=None):
+        """Store the outcome of processing one file"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            conn.execute('''
+                INSERT OR REPLACE INTO ingested_resumes
+                    (file_name, file_path, file_hash, resume_hash, status, error, matches, skills)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (os.path.basename(file_path), file_path, file_hash, resume_hash, status, error,
+                  json.dumps(matches or []), json.dumps(skills or [])))
+            conn.commit()
+        finally:
+            conn.close()
+
+    def list_recent(self, limit=100):
+        """List the most recently ingested resumes"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute('''
+                SELECT id, file_name, file_path, resume_hash, status, error, matches, skills, ingested_at
+                FROM ingested_resumes ORDER BY id DESC LIMIT ?
+            ''', (limit,))
+            return [{
+                'id': row[0],
+                'file_name': row[1],
+                'file_path': row[2],
+                'resume_hash': row[3],
+                'status': row[4],
+                'error': row[5],
+                'matches': json.loads(row[6] or '[]'),
+                'skills': json.loads(row[7] or '[]'),
+                'ingested_at': row[8]
+            } for row in cursor.fetchall()]
+        finally:
+            conn.close()
+
+
+class InotifyWatcher:
+    """Linux inotify watch on one directory, called through ctypes
+
+    Reports files that were closed after writing or moved into the directory.
+    """
+
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    _EVENT_HEADER = struct.Struct('iIII')
+
+    def __init__(self, directory):
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory), self.IN_CLOSE_WRITE | self.IN_MOVED_TO) < 0:
+            error = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(error, f"inotify_add_watch failed for {directory}")
+        self.directory = directory
+
+    def poll(self, timeout):
+        """Wait up to timeout seconds and return the paths of files that changed"""
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        paths, offset = [], 0
+        while offset + self._EVENT_HEADER.size <= len(data):
+            _, _, _, name_length = self._EVENT_HEADER.unpack_from(data, offset)
+            offset += self._EVENT_HEADER.size
+            name = data[offset:offset + name_length].rstrip(b'\0')
+            offset += name_length
+            if name:
+                paths.append(os.path.join(self.directory, os.fsdecode(name)))
+        return paths
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """Fallback watcher that rescans the directory on every poll"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        # path -> (size, mtime) at the last scan
+        self.seen = {}
+
+    def poll(self, timeout):
+        """Wait timeout seconds and return the files that are new or changed since the last scan"""
+        time.sleep(timeout)
+        current = {}
+        for path in list_resume_files(self.directory):
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            current[path] = (stat.st_size, stat.st_mtime)
+        changed = [path for path, signature in current.items() if self.seen.get(path) != signature]
+        self.seen = current
+        return changed
+
+    def close(self):
+        pass
+
+
+def list_resume_files(directory):
+    """Return the paths of the resume files currently in a directory"""
+    return [entry.path for entry in os.scandir(directory)
+            if entry.is_file() and entry.name.lower().endswith(RESUME_EXTENSIONS)]
+
+
+def create_watcher(directory, polling=False):
+    """Watch a directory with inotify where available, else by polling"""
+    if not polling:
+        try:
+            return InotifyWatcher(directory)
+        except (OSError, AttributeError) as e:
+            logger.warning("inotify unavailable (%s); falling back to polling", e)
+    return PollingWatcher(directory)
+
+
+class IngestionDaemon:
+    """Pick up resumes dropped into a folder and run them through the local pipeline
+
+    Each new file is extracted, scored locally against the JD library, added to the
+    candidate index and recorded in SQLite, on a bounded worker pool. Files are only
+    processed once their size and mtime have stopped changing, so partially copied
+    PDFs are never read.
+    """
+
+    def __init__(self, directory, db_path="users.db", max_workers=4, settle_seconds=SETTLE_SECONDS, polling=False):
+        self.directory = directory
+        self.db_path = db_path
+        self.settle_seconds = settle_seconds
+        self.log = IngestionLog(db_path)
+        self.watcher = create_watcher(directory, polling)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ingest")
+        # path -> (size, mtime, time the file was last seen changing)
+        self.pending = {}
+        # path -> (size, mtime) handed to a worker and not finished yet
+        self.submitted = {}
+        self.stopped = threading.Event()
+
+    def _observe(self, path):
+        """Note that a file may have changed"""
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            self.pending.pop(path, None)
+            self.submitted.pop(path, None)
+            return
+        signature = (stat.st_size, stat.st_mtime)
+        if self.submitted.get(path) == signature:
+            return
+        previous = self.pending.get(path)
+        if previous is None or previous[:2] != signature:
+            self.pending[path] = (*signature, time.monotonic())
+
+    def _submit_settled(self):
+        """Hand files that have stopped changing to the worker pool"""
+        now = time.monotonic()
+        for path, (size, mtime, changed_at) in list(self.pending.items()):
+            self._observe(path)
+            if path not in self.pending or self.pending[path][:2] != (size, mtime):
+                continue
+            if size > 0 and now - changed_at >= self.settle_seconds:
+                del self.pending[path]
+                self.submitted[path] = (size, mtime)
+                self.executor.submit(self._process_submitted, path, (size, mtime))
+
+    def _process_submitted(self, path, signature):
+        """Process a file handed to the pool, then forget it so later changes are picked up"""
+        try:
+            self.process_file(path)
+        finally:
+            # A newer version of the file may have been submitted in the meantime
+            if self.submitted.get(path) == signature:
+                self.submitted.pop(path, None)
+
+    def process_file(self, path):
+        """Extract, score, index and record one resume file"""
+        from io import BytesIO
+        from pdf_utils import input_pdf_text
+        from resume_model import get_parsed_resume
+        from local_scoring import score_resume
+        from candidate_index import index_resume
+
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError as e:
+            logger.warning("could not read %s: %s", path, e)
+            return
+
+        file_hash = hashlib.sha256(data).hexdigest()
+        if self.log.is_ingested(file_hash):
+            logger.info("skipping %s: already ingested", path)
+            return
+
+        try:
+            text = input_pdf_text(BytesIO(data))
+            parsed = get_parsed_resume(text)
+            matches = []
+            for record in self.job_descriptions():
+                result = score_resume(parsed, record['requirements'])
+                matches.append({'jd_id': record['id'], 'title': record['title'], 'score': result['JD Match']})
+            matches.sort(key=lambda match: int(match['score'].rstrip('%')), reverse=True)
+
+            index_resume(parsed.doc_hash, text, os.path.basename(path))
+            self.log.record(path, file_hash, 'done', resume_hash=parsed.doc_hash,
+                            matches=matches[:TOP_MATCHES], skills=parsed.skill_names())
+            logger.info("ingested %s", path)
+        except Exception as e:
+            self.log.record(path, file_hash, 'failed', error=str(e))
+            logger.exception("failed to ingest %s", path)
+
+    def job_descriptions(self):
+        """Return the job descriptions every new resume is scored against"""
+        from jd_library import JobDescriptionLibrary
+        return JobDescriptionLibrary(self.db_path).list_job_descriptions()
+
+    def run(self, once=False):
+        """Watch the folder until stop() is called; with once, process what is there and return"""
+        for path in list_resume_files(self.directory):
+            self._observe(path)
+
+        while not self.stopped.is_set():
+            for path in self.watcher.poll(POLL_INTERVAL):
+                if path.lower().endswith(RESUME_EXTENSIONS):
+                    self._observe(path)
+            self._submit_settled()
+            # Empty files may still be being created; they do not keep a one-off run alive
+            if once and not any(size for size, _, _ in self.pending.values()):
+                break
+
+        self.executor.shutdown(wait=True)
+        self.watcher.close()
+
+    def stop(self):
+        self.stopped.set()
+
+
+def show_ingestion_page():
+    """Display the resumes ingested from the watched folder"""
+    import streamlit as st
+
+    st.title("📥 Resume Inbox")
+    st.markdown("Resumes dropped into the watched folder, scored locally against the job description library.")
+    st.caption("Start the watcher with: `python ingest_daemon.py --watch <folder>`")
+
+    records = IngestionLog().list_recent()
+    if not records:
+        st.info("No resumes have been ingested yet.")
+        return
+
+    if st.button("🔄 Refresh"):
+        st.rerun()
+
+    st.dataframe({
+        'File': [record['file_name'] for record in records],
+        'Status': [record['status'] for record in records],
+        'Best Match': [f"{record['matches'][0]['title']} ({record['matches'][0]['score']})"
+                       if record['matches'] else '—' for record in records],
+        'Skills': [', '.join(record['skills'][:8]) for record in records],
+        'Ingested': [record['ingested_at'] for record in records]
+    })
+
+    failed = [record for record in records if record['status'] == 'failed']
+    if failed:
+        with st.expander(f"⚠️ {len(failed)} file(s) could not be processed"):
+            for record in failed:
+                st.markdown(f"- **{record['file_name']}**: {record['error']}")
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Watch a folder and ingest new resume PDFs")
+    parser.add_argument("--watch", required=True, help="Directory to watch for resume PDFs")
+    parser.add_argument("--db", default="users.db", help="SQLite database to record results in")
+    parser.add_argument("--workers", type=int, default=4, help="Number of files processed in parallel")
+    parser.add_argument("--settle", type=float, default=SETTLE_SECONDS,
+                        help="Seconds a file must stay unchanged before it is processed")
+    parser.add_argument("--poll", action="store_true", help="Poll the folder instead of using inotify")
+    parser.add_argument("--once", action="store_true", help="Process the files present now and exit")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    if not os.path.isdir(args.watch):
+        parser.error(f"{args.watch} is not a directory")
+
+    daemon = IngestionDaemon(args.watch, args.db, args.workers, args.settle, args.poll)
+    signal.signal(signal.SIGTERM, lambda *_: daemon.stop())
+    try:
+        daemon.run(once=args.once)
+    except KeyboardInterrupt:
+        daemon.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+import sqlite3
+import hashlib
+import json
+import re
+import unicodedata
+from local_scoring import find_skills, extract_keywords
+from blob_store import get_blob_store
+
+# Seniority levels checked from most to least senior; the first match wins
+SENIORITY_PATTERNS = [
+    ('executive', r'\b(chief|vp|vice president|head of|director)\b'),
+    ('principal', r'\b(principal|staff|architect)\b'),
+    ('lead', r'\b(lead|manager)\b'),
+    ('senior', r'\b(senior|sr\.?)\b'),
+    ('mid', r'\b(mid[- ]level|intermediate)\b'),
+    ('junior', r'\b(junior|jr\.?|entry[- ]level|graduate)\b'),
+    ('intern', r'\b(intern|internship)\b')
+]
+
+MUST_HAVE_MARKERS = r'(required|requirements|must|qualifications|what you.ll need|you have|essential)'
+NICE_TO_HAVE_MARKERS = r'(nice to have|nice-to-have|preferred|bonus|a plus|desirable|good to have)'
+
+# Parsed records are shared by every session in the process
+_requirements_cache = {}
+
+
+def normalize_jd(jd_text):
+    """Normalize a job description so trivially different copies compare equal"""
+    text = unicodedata.normalize('NFKC', jd_text or '')
+    lines = []
+    for line in text.splitlines():
+        line = re.sub(r'^\s*[-*•●▪◦]+\s*', '- ', line)
+        line = re.sub(r'[ \t]+', ' ', line).strip()
+        if line:
+            lines.append(line)
+    return '\n'.join(lines)
+
+
+def hash_jd(jd_text):
+    """Hash a job description by its normalized, case-folded content"""
+    return hashlib.sha256(normalize_jd(jd_text).lower().encode()).hexdigest()
+
+
+def detect_seniority(text):
+    """Detect the seniority level of a job description"""
+    lowered = text.lower()
+    for level, pattern in SENIORITY_PATTERNS:
+        if re.search(pattern, lowered):
+            return level
+    return 'unspecified'
+
+
+def parse_job_description(jd_text):
+    """Parse a job description into a structured requirements record"""
+    normalized = normalize_jd(jd_text)
+    lines = normalized.splitlines()
+
+    must_have, nice_to_have = [], []
+    mode = None
+    for line in lines:
+        lowered = line.lower()
+        is_header = not line.startswith('- ') and len(line) < 60
+        if is_header and re.search(NICE_TO_HAVE_MARKERS, lowered):
+            mode = 'nice'
+            continue
+        if is_header and re.search(MUST_HAVE_MARKERS, lowered):
+            mode = 'must'
+            continue
+
+        if re.search(NICE_TO_HAVE_MARKERS, lowered):
+            target = nice_to_have
+        elif mode == 'must' or re.search(MUST_HAVE_MARKERS, lowered):
+            target = must_have
+        elif mode == 'nice':
+            target = nice_to_have
+        else:
+            continue
+
+        for skill in find_skills(line):
+            if skill not in must_have and skill not in nice_to_have:
+                target.append(skill)
+
+    # Without explicit requirement sections every detected skill is treated as required
+    if not must_have and not nice_to_have:
+        must_have = find_skills(normalized)
+
+    years = re.findall(r'(\d{1,2})\+?\s*(?:-\s*\d{1,2}\s*)?years', normalized.lower())
+    keywords = [
+        keyword for keyword in extract_keywords(normalized, limit=25)
+        if keyword not in must_have and keyword not in nice_to_have
+    ]
+
+    return {
+        'title': lines[0][:80] if lines else '',
+        'seniority': detect_seniority(normalized),
+        'min_years_experience': min(int(y) for y in years) if years else None,
+        'must_have': must_have,
+        'nice_to_have': nice_to_have,
+        'keywords': keywords
+    }
+
+
+def get_requirements(jd_text):
+    """Parse a job description once per process and reuse the record afterwards"""
+    jd_hash = hash_jd(jd_text)
+    if jd_hash not in _requirements_cache:
+        _requirements_cache[jd_hash] = parse_job_description(jd_text)
+    return _requirements_cache[jd_hash]
+
+
+def format_requirements(requirements):
+    """Render a requirements record as compact text for use inside prompts"""
+    lines = [f"Role: {requirements['title']}", f"Seniority: {requirements['seniority']}"]
+    if requirements.get('min_years_experience') is not None:
+        lines.append(f"Minimum Experience: {requirements['min_years_experience']} years")
+    lines.append(f"Must-have Skills: {', '.join(requirements['must_have']) or 'none stated'}")
+    lines.append(f"Nice-to-have Skills: {', '.join(requirements['nice_to_have']) or 'none stated'}")
+    lines.append(f"Other Keywords: {', '.join(requirements['keywords'])}")
+    return '\n'.join(lines)
+
+
+class JobDescriptionLibrary:
+    def __init__(self, db_path="users.db"):
+        self.db_path = db_path
+        self.init_database()
+
+    def init_database(self):
+        """Create the job descriptions table if it doesn't exist"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS job_descriptions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                jd_hash TEXT UNIQUE NOT NULL,
+                title TEXT NOT NULL,
+                jd_text TEXT NOT NULL,
+                requirements TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                last_used_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                use_count INTEGER DEFAULT 0
+            )
+        ''')
+
+        conn.commit()
+        conn.close()
+
+    def _row_to_record(self, row):
+        """Convert a job_descriptions row into a record dict"""
+        return {
+            'id': row[0],
+            'jd_hash': row[1],
+            'title': row[2],
+            'jd_text': get_blob_store(self.db_path).unpack(row[3]),
+            'requirements': json.loads(row[4]),
+            'created_at': row[5],
+            'last_used_at': row[6],
+            'use_count': row[7]
+        }
+
+    def get_or_create(self, jd_text, title=None):
+        """Return the stored record for a job description, parsing and saving it on first use"""
+        jd_hash = hash_jd(jd_text)
+        # The blob store creates its table on first use, which must not happen inside
+        # the write transaction below or it waits on this connection's lock
+        blobs = get_blob_store(self.db_path)
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute('''
+                UPDATE job_descriptions
+                SET use_count = use_count + 1, last_used_at = CURRENT_TIMESTAMP
+                WHERE jd_hash = ?
+            ''', (jd_hash,))
+
+            if cursor.rowcount == 0:
+                requirements = get_requirements(jd_text)
+                cursor.execute('''
+                    INSERT INTO job_descriptions (jd_hash, title, jd_text, requirements, use_count)
+                    VALUES (?, ?, ?, ?, 1)
+                ''', (jd_hash, title or requirements['title'] or 'Untitled job description',
+                      blobs.pack(normalize_jd(jd_text)), json.dumps(requirements)))
+
+            conn.commit()
+            cursor.execute('''
+                SELECT id, jd_hash, title, jd_text, requirements, created_at, last_used_at, use_count
+                FROM job_descriptions WHERE jd_hash = ?
+            ''', (jd_hash,))
+            record = self._row_to_record(cursor.fetchone())
+            _requirements_cache[jd_hash] = record['requirements']
+            return record
+        finally:
+            conn.close()
+
+    def get_by_hash(self, jd_hash):
+        """Get a stored job description by its hash"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute('''
+                SELECT id, jd_hash, title, jd_text, requirements, created_at, last_used_at, use_count
+                FROM job_descriptions WHERE jd_hash = ?
+            ''', (jd_hash,))
+            row = cursor.fetchone()
+            return self._row_to_record(row) if row else None
+        except Exception as e:
+            return None
+        finally:
+            conn.close()
+
+    def list_job_descriptions(self):
+        """List stored job descriptions, most recently used first"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute('''
+                SELECT id, jd_hash, title, jd_text, requirements, created_at, last_used_at, use_count
+                FROM job_descriptions ORDER BY last_used_at DESC, id DESC
+            ''')
+            return [self._row_to_record(row) for row in cursor.fetchall()]
+        except Exception as e:
+            return []
+        finally:
+            conn.close()
+
+    def delete(self, jd_hash):
+        """Remove a job description from the library"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute('DELETE FROM job_descriptions WHERE jd_hash = ?', (jd_hash,))
+            conn.commit()
+            _requirements_cache.pop(jd_hash, None)
+            return cursor.rowcount > 0
+        finally:
+            conn.close()
@@ -0,0 +1,233 @@
+import sqlite3
+import json
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor, wait
+from llm_scheduler import INTERACTIVE, BACKGROUND, request_context
+from blob_store import get_blob_store
+
+ACTIVE_STATUSES = ('queued', 'running')
+
+
+class JobRunner:
+    """Run LLM work on a bounded thread pool, tracking every job in SQLite
+
+    Jobs outlive Streamlit reruns: pages keep only the job id in session state
+    and read the status and result back from the job table.
+    """
+
+    def __init__(self, db_path="users.db", max_workers=4):
+        self.db_path = db_path
+        self.max_workers = max_workers
+        # Separate pools keep queued background work from delaying interactive jobs
+        self.executors = {
+            INTERACTIVE: ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm-job"),
+            BACKGROUND: ThreadPoolExecutor(max_workers=max(1, max_workers // 2), thread_name_prefix="llm-bg-job")
+        }
+        self.futures = {}
+        self.lock = threading.Lock()
+        self.init_database()
+
+    def init_database(self):
+        """Create the jobs table and fail jobs left unfinished by a previous process"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS llm_jobs (
+                id TEXT PRIMARY KEY,
+                user_id INTEGER,
+                kind TEXT NOT NULL,
+                status TEXT NOT NULL,
+                result TEXT,
+                error TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                started_at TIMESTAMP,
+                finished_at TIMESTAMP
+            )
+        ''')
+        cursor.execute('''
+            UPDATE llm_jobs SET status = 'failed', error = 'Interrupted by application restart',
+                finished_at = CURRENT_TIMESTAMP
+            WHERE status IN ('queued', 'running')
+        ''')
+
+        conn.commit()
+        conn.close()
+
+    def _update(self, job_id, sql, params=()):
+        """Run an UPDATE against a single job row, returning the number of rows changed"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            cursor = conn.execute(sql, (*params, job_id))
+            conn.commit()
+            return cursor.rowcount
+        finally:
+            conn.close()
+
+    def submit(self, kind, fn, *args, user_id=None, priority=BACKGROUND, **kwargs):
+        """Queue fn(*args, **kwargs) and return the new job id
+
+        LLM calls made by fn are attributed to user_id in the given priority lane.
+        The return value of fn must be JSON serializable.
+        """
+        job_id = uuid.uuid4().hex
+        conn = sqlite3.connect(self.db_path)
+        try:
+            conn.execute('''
+                INSERT INTO llm_jobs (id, user_id, kind, status) VALUES (?, ?, ?, 'queued')
+            ''', (job_id, user_id, kind))
+            conn.commit()
+        finally:
+            conn.close()
+
+        with self.lock:
+            self.futures[job_id] = self.executors[priority].submit(
+                self._run, job_id, user_id, priority, fn, args, kwargs
+            )
+        return job_id
+
+    def _run(self, job_id, user_id, priority, fn, args, kwargs):
+        """Execute a job on a worker thread and record its outcome"""
+        started = self._update(job_id, '''
+            UPDATE llm_jobs SET status = 'running', started_at = CURRENT_TIMESTAMP
+            WHERE id = ? AND status = 'queued'
+        ''')
+        if not started:
+            # Cancelled between being queued and reaching a worker
+            with self.lock:
+                self.futures.pop(job_id, None)
+            return
+
+        # Status guards keep a cancelled job from being overwritten by its late result
+        try:
+            with request_context(user_id, priority):
+                result = fn(*args, **kwargs)
+            self._update(job_id, '''
+                UPDATE llm_jobs SET status = 'done', result = ?, finished_at = CURRENT_TIMESTAMP
+                WHERE id = ? AND status = 'running'
+            ''', (get_blob_store(self.db_path).pack(json.dumps(result)),))
+        except Exception as e:
+            self._update(job_id, '''
+                UPDATE llm_jobs SET status = 'failed', error = ?, finished_at = CURRENT_TIMESTAMP
+                WHERE id = ? AND status = 'running'
+            ''', (str(e),))
+        finally:
+            with self.lock:
+                self.futures.pop(job_id, None)
+
+    def cancel(self, job_id):
+        """Cancel a job; queued jobs never start and running jobs have their result discarded"""
+        with self.lock:
+            future = self.futures.pop(job_id, None)
+        if future is not None:
+            future.cancel()
+        self._update(job_id, '''
+            UPDATE llm_jobs SET status = 'cancelled', finished_at = CURRENT_TIMESTAMP
+            WHERE id = ? AND status IN ('queued', 'running')
+        ''')
+
+    def wait(self, job_id, timeout=None):
+        """Wait up to timeout seconds for a job to finish, then return its current state"""
+        with self.lock:
+            future = self.futures.get(job_id)
+        if future is not None:
+            wait([future], timeout=timeout)
+        return self.get(job_id)
+
+    def get(self, job_id):
+        """Get a job's status, result and error"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute('''
+                SELECT id, user_id, kind, status, result, error, created_at, started_at, finished_at
+                FROM llm_jobs WHERE id = ?
+            ''', (job_id,))
+            row = cursor.fetchone()
+            if not row:
+                return None
+            return {
+                'id': row[0],
+                'user_id': row[1],
+                'kind': row[2],
+                'status': row[3],
+                'result': json.loads(get_blob_store(self.db_path).unpack(row[4])) if row[4] is not None else None,
+                'error': row[5],
+                'created_at': row[6],
+                'started_at': row[7],
+                'finished_at': row[8]
+            }
+        finally:
+            conn.close()
+
+    def list_jobs(self, user_id, limit=20):
+        """List a user's most recent jobs without their results"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute('''
+                SELECT id, kind, status, error, created_at, finished_at FROM llm_jobs
+                WHERE user_id = ? ORDER BY created_at DESC LIMIT ?
+            ''', (user_id, limit))
+            return [{
+                'id': row[0],
+                'kind': row[1],
+                'status': row[2],
+                'error': row[3],
+                'created_at': row[4],
+                'finished_at': row[5]
+            } for row in cursor.fetchall()]
+        finally:
+            conn.close()
+
+
+_job_runner = None
+_job_runner_lock = threading.Lock()
+
+
+def get_job_runner():
+    """Return the process-wide job runner shared by all Streamlit sessions"""
+    global _job_runner
+    with _job_runner_lock:
+        if _job_runner is None:
+            _job_runner = JobRunner(max_workers=int(os.getenv("LLM_JOB_WORKERS", "4")))
+        return _job_runner
+
+
+def show_job_status(job_id, label):
+    """Render the state of a background job; returns the job once it has finished"""
+    import streamlit as st
+
+    job = get_job_runner().get(job_id)
+    if job is None:
+        return None
+
+    if job['status'] in ACTIVE_STATUSES:
+        st.info(f"⏳ {label} is {job['status']}. You can keep using the app; the result will be kept.")
+        if st.button("🔄 Refresh Status", key=f"refresh_{job_id}"):
+            st.rerun()
+        _watch_job(job_id)
+        return None
+
+    if job['status'] == 'failed':
+        st.error(f"{label} failed: {job['error']}")
+    elif job['status'] == 'cancelled':
+        st.warning(f"{label} was cancelled.")
+    return job
+
+
+def _watch_job(job_id, poll_interval=2):
+    """Poll a running job in a small fragment and rerun the app once it finishes"""
+    import streamlit as st
+
+    @st.fragment(run_every=poll_interval)
+    def watch():
+        job = get_job_runner().get(job_id)
+        if job is None or job['status'] not in ACTIVE_STATUSES:
+            st.rerun()
+
+    watch()
@@ -0,0 +1,67 @@
+import html
+from skill_matcher import SkillMatcher, get_skill_matcher
+
+REQUIREMENT_PRIORITIES = [
+    ('must_have', 'Must-have'),
+    ('nice_to_have', 'Nice-to-have'),
+    ('keywords', 'Keyword')
+]
+
+
+def requirement_terms(requirements):
+    """Map every surface form of a JD's requirement terms (including skill aliases) to the requirement"""
+    skill_aliases = get_skill_matcher().aliases
+    terms = {}
+    for key, _ in REQUIREMENT_PRIORITIES:
+        for requirement in requirements.get(key, []):
+            terms.setdefault(requirement.lower(), requirement)
+            for alias in skill_aliases.get(requirement.lower(), []):
+                terms.setdefault(alias, requirement)
+    return terms
+
+
+def make_snippet(text, start, end, context=60):
+    """Render the text around a match as HTML with the match highlighted"""
+    left = max(0, start - context)
+    right = min(len(text), end + context)
+    # Widen to whole words so snippets do not start or end mid-word
+    while left > 0 and not text[left - 1].isspace():
+        left -= 1
+    while right < len(text) and not text[right].isspace():
+        right += 1
+
+    before = ' '.join(text[left:start].split())
+    after = ' '.join(text[end:right].split())
+    if before and text[start - 1].isspace():
+        before += ' '
+    if after and text[end].isspace():
+        after = ' ' + after
+    return (('… ' if left > 0 else '') + html.escape(before) + '<mark>' + html.escape(text[start:end]) +
+            '</mark>' + html.escape(after) + (' …' if right < len(text) else ''))
+
+
+def find_evidence(resume_text, requirements, max_snippets=2):
+    """Locate every JD requirement in the resume in one pass over the text
+
+    Returns one dict per requirement, in priority order, with its 'priority',
+    the number of mentions ('count') and up to max_snippets highlighted 'snippets'.
+    """
+    matcher = SkillMatcher(requirement_terms(requirements))
+    mentions = {}
+    for match in matcher.find(resume_text):
+        mentions.setdefault(match.skill, []).append(match)
+
+    evidence, seen = [], set()
+    for key, priority in REQUIREMENT_PRIORITIES:
+        for requirement in requirements.get(key, []):
+            if requirement in seen:
+                continue
+            seen.add(requirement)
+            found = mentions.get(requirement, [])
+            evidence.append({
+                'requirement': requirement,
+                'priority': priority,
+                'count': len(found),
+                'snippets': [make_snippet(resume_text, match.start, match.end) for match in found[:max_snippets]]
+            })
+    return evidence
@@ -0,0 +1,249 @@
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from local_scoring import STOP_WORDS
+from resume_model import hash_resume
+from skill_matcher import get_skill_matcher
+
+# Common abbreviations, mapped to the canonical form used for comparison
+KEYWORD_ALIASES = {
+    'js': 'javascript',
+    'ts': 'typescript',
+    'k8s': 'kubernetes',
+    'ml': 'machine learning',
+    'dl': 'deep learning',
+    'ai': 'artificial intelligence',
+    'nlp': 'natural language processing',
+    'postgres': 'postgresql',
+    'gcp': 'google cloud platform',
+    'aws': 'amazon web services',
+    'oop': 'object oriented programming',
+    'bi': 'business intelligence',
+    'ux': 'user experience',
+    'ui': 'user interface',
+    'qa': 'quality assurance',
+    'sre': 'site reliability engineering',
+    'nodejs': 'node.js',
+    'reactjs': 'react',
+    'react.js': 'react',
+    'tf': 'tensorflow',
+    'sklearn': 'scikit-learn'
+}
+
+MAX_PHRASE_WORDS = 4
+VERIFIER_CACHE_SIZE = 32
+
+_WORD_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#.-]*")
+
+
+def _singular(word):
+    """Strip a simple English plural ending"""
+    if '.' in word:
+        return word
+    if len(word) > 4 and word.endswith('ies'):
+        return word[:-3] + 'y'
+    if len(word) > 3 and word.endswith('s') and not word.endswith(('ss', 'us', 'is')):
+        return word[:-1]
+    return word
+
+
+def _words(text):
+    """Split text into lowercase, singular words"""
+    words = [_singular(word.rstrip('.-')) for word in _WORD_PATTERN.findall(unicodedata.normalize('NFKC', text or '').lower())]
+    return [word for word in words if word]
+
+
+# Expansions go through the same normalization as everything they are compared with
+_CANONICAL_ALIASES = {' '.join(_words(alias)): ' '.join(_words(expansion)) for alias, expansion in KEYWORD_ALIASES.items()}
+
+
+def normalize_keyword(text):
+    """Normalize a keyword or phrase for comparison: case, unicode, punctuation, plurals, abbreviations"""
+    phrase = ' '.join(_words(text))
+    return _CANONICAL_ALIASES.get(phrase, phrase)
+
+
+def edit_distance(a, b):
+    """Levenshtein distance between two strings"""
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        previous = current
+    return previous[-1]
+
+
+def is_taxonomy_term(keyword):
+    """Check whether a keyword is exactly a skill or alias from the skills taxonomy"""
+    lowered = (keyword or '').strip().lower()
+    return any(match.start == 0 and match.end == len(lowered) for match in get_skill_matcher().find(lowered))
+
+
+def allows_typos(keyword, term):
+    """Check whether a keyword may be matched with typos at all
+
+    Skills are distinct names one edit apart from ordinary words (Scala/scale,
+    Spark/spare), and a single plain word may be an ordinary word itself, so only
+    multi-word phrases and tokens with digits or symbols are matched fuzzily.
+    """
+    if is_taxonomy_term(keyword) or is_taxonomy_term(term):
+        return False
+    return ' ' in term or not term.isalpha()
+
+
+def max_typos(term):
+    """Edit distance tolerated for a term: none for short terms, more for long ones"""
+    if len(term) <= 4:
+        return 0
+    if len(term) <= 8:
+        return 1
+    return 2
+
+
+class BKTree:
+    """Burkhard-Keller tree for finding terms within a bounded edit distance"""
+
+    def __init__(self, terms=()):
+        self.root = None
+        for term in terms:
+            self.add(term)
+
+    def add(self, term):
+        """Insert a term"""
+        if self.root is None:
+            self.root = (term, {})
+            return
+        node = self.root
+        while True:
+            distance = edit_distance(term, node[0])
+            if distance == 0:
+                return
+            child = node[1].get(distance)
+            if child is None:
+                node[1][distance] = (term, {})
+                return
+            node = child
+
+    def search(self, term, max_distance):
+        """Return (distance, term) pairs within max_distance of term, closest first"""
+        if self.root is None:
+            return []
+        matches, stack = [], [self.root]
+        while stack:
+            node_term, children = stack.pop()
+            distance = edit_distance(term, node_term)
+            if distance <= max_distance:
+                matches.append((distance, node_term))
+            # Triangle inequality: only children in [d - k, d + k] can be close enough
+            for child_distance, child in children.items():
+                if distance - max_distance <= child_distance <= distance + max_distance:
+                    stack.append(child)
+        return sorted(matches)
+
+
+class ResumeKeywordIndex:
+    """Normalized phrases of one resume, for exact and fuzzy keyword lookups"""
+
+    def __init__(self, resume_text):
+        words = _words(resume_text)
+
+        self.phrases = set()
+        self.phrases_by_length = {}
+        for length in range(1, MAX_PHRASE_WORDS + 1):
+            grams = {' '.join(words[i:i + length]) for i in range(len(words) - length + 1)
+                     if words[i] not in STOP_WORDS and words[i + length - 1] not in STOP_WORDS}
+            self.phrases_by_length[length] = grams
+            self.phrases |= grams
+        # Abbreviations in the resume also count as their expansion
+        self.phrases |= {_CANONICAL_ALIASES[phrase] for phrase in list(self.phrases) if phrase in _CANONICAL_ALIASES}
+
+        self.trees = {}
+
+    def _tree(self, length):
+        """Build the BK-tree for phrases of a given word count on first use"""
+        if length not in self.trees:
+            # Only phrases long enough to allow a typo can ever match fuzzily
+            self.trees[length] = BKTree(phrase for phrase in self.phrases_by_length.get(length, ())
+                                        if len(phrase) > 4)
+        return self.trees[length]
+
+    def find(self, keyword):
+        """Return (evidence, distance) if the keyword appears in the resume, else None
+
+        A distance of 0 is an exact match after normalization or through a known
+        alias; anything larger is only a possible typo.
+        """
+        term = normalize_keyword(keyword)
+        # "machine-learning" and "machine learning" are the same keyword
+        candidates = [term] if '-' not in term else [term, normalize_keyword(term.replace('-', ' '))]
+        for candidate in candidates:
+            if candidate in self.phrases:
+                return candidate, 0
+
+        for candidate in candidates:
+            typos = max_typos(candidate)
+            length = candidate.count(' ') + 1
+            if not candidate or typos == 0 or length > MAX_PHRASE_WORDS or not allows_typos(keyword, candidate):
+                continue
+            matches = self._tree(length).search(candidate, typos)
+            if matches:
+                distance, evidence = matches[0]
+                return evidence, distance
+        return None
+
+
+_index_cache = OrderedDict()
+_index_lock = threading.Lock()
+
+
+def get_keyword_index(resume_text):
+    """Return the keyword index of a resume, built once per distinct document"""
+    doc_hash = hash_resume(resume_text)
+    with _index_lock:
+        index = _index_cache.get(doc_hash)
+        if index is not None:
+            _index_cache.move_to_end(doc_hash)
+            return index
+
+    index = ResumeKeywordIndex(resume_text)
+    with _index_lock:
+        _index_cache[doc_hash] = index
+        while len(_index_cache) > VERIFIER_CACHE_SIZE:
+            _index_cache.popitem(last=False)
+    return index
+
+
+def verify_missing_keywords(resume_text, keywords):
+    """Split keywords reported missing into those really missing and those found in the resume
+
+    Returns (missing, found, possible_typos). Only exact or alias matches count as
+    found; close spellings stay missing and are listed in possible_typos. found and
+    possible_typos are lists of {'keyword', 'evidence', 'distance'} dicts.
+    """
+    index = get_keyword_index(resume_text)
+    missing, found, possible_typos = [], [], []
+    for keyword in keywords:
+        match = index.find(str(keyword))
+        if match is None or match[1] > 0:
+            missing.append(keyword)
+        if match is not None:
+            entry = {'keyword': keyword, 'evidence': match[0], 'distance': match[1]}
+            (found if match[1] == 0 else possible_typos).append(entry)
+    return missing, found, possible_typos
+
+
+def verify_analysis(response_dict, resume_text):
+    """Drop 'MissingKeywords' entries that the resume actually contains
+
+    The removed entries are kept under 'FoundKeywords' so the page can show them;
+    missing keywords with a close spelling in the resume are noted under 'PossibleTypos'.
+    """
+    missing, found, possible_typos = verify_missing_keywords(resume_text, response_dict.get('MissingKeywords', []))
+    response_dict['MissingKeywords'] = missing
+    response_dict['FoundKeywords'] = found
+    response_dict['PossibleTypos'] = possible_typos
+    return response_dict
@@ -0,0 +1,116 @@
+import hashlib
+import threading
+from llm_scheduler import scheduler, current_request_context
+
+
+class _InFlightCall:
+    """A call in progress whose result is shared with every waiter"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.ticket = None
+
+
+class SingleFlight:
+    """Coalesce concurrent calls with the same key into a single execution"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}
+        self.requests = 0
+        self.executed = 0
+        self.coalesced = 0
+
+    def do(self, key, fn, *args, ticket=None, **kwargs):
+        """Run fn once per key at a time; concurrent callers with the same key get the same result
+
+        ticket is the caller's place in the scheduler queue. A caller joining a call
+        promotes the leader's ticket to its own priority, so an interactive request
+        never waits behind the background call it joined.
+        """
+        with self.lock:
+            self.requests += 1
+            call = self.calls.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = _InFlightCall()
+                call.ticket = ticket
+                self.calls[key] = call
+                self.executed += 1
+            else:
+                self.coalesced += 1
+
+        if not is_leader:
+            if ticket is not None and call.ticket is not None:
+                call.ticket.promote(ticket.priority)
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call.done.set()
+
+    def get_metrics(self):
+        """Return request, execution and coalescing counters"""
+        with self.lock:
+            return {
+                'requests': self.requests,
+                'executed': self.executed,
+                'coalesced': self.coalesced,
+                'in_flight': len(self.calls)
+            }
+
+
+# Shared by every session in the process
+single_flight = SingleFlight()
+
+
+def _cohere_generate(co, prompt, model, max_tokens, temperature):
+    """Call Cohere's generate endpoint and return the generated text"""
+    response = co.generate(
+        model=model,
+        prompt=prompt,
+        max_tokens=max_tokens,
+        temperature=temperature,
+        k=0,
+        stop_sequences=[],
+        return_likelihoods='NONE'
+    )
+    return response.generations[0].text.strip()
+
+
+def _scheduled_generate(co, prompt, model, max_tokens, temperature, ticket):
+    """Wait for a concurrency slot, then call Cohere"""
+    with scheduler.slot(ticket=ticket):
+        return _cohere_generate(co, prompt, model, max_tokens, temperature)
+
+
+def generate(co, prompt, max_tokens=1000, temperature=0.7, model='command', user_id=None, priority=None):
+    """Generate text with Cohere, sharing one in-flight call between identical concurrent requests
+
+    The user and priority lane default to the request context of the calling thread.
+    Every caller takes a token from their own user's bucket before joining a call,
+    so coalesced requests still count against each user's limit and a
+    RateLimitExceeded only reaches the user who ran out.
+    """
+    context_user_id, context_priority = current_request_context()
+    user_id = context_user_id if user_id is None else user_id
+    priority = context_priority if priority is None else priority
+
+    scheduler.take_user_token(user_id)
+    ticket = scheduler.ticket(priority)
+    key = hashlib.sha256(f"{model}\x00{max_tokens}\x00{temperature}\x00{prompt}".encode()).hexdigest()
+    return single_flight.do(
+        key, _scheduled_generate, co, prompt, model, max_tokens, temperature, ticket, ticket=ticket
+    )
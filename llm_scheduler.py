@@ -0,0 +1,205 @@
+import heapq
+import itertools
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Priority lanes; lower values are admitted first
+INTERACTIVE = 0
+BACKGROUND = 1
+
+_context = threading.local()
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a user has exhausted their LLM request budget"""
+
+
+def set_request_context(user_id, priority=INTERACTIVE):
+    """Attribute LLM calls made on the current thread to a user and priority lane"""
+    _context.user_id = user_id
+    _context.priority = priority
+
+
+def current_request_context():
+    """Return the (user_id, priority) set for the current thread"""
+    return getattr(_context, 'user_id', None), getattr(_context, 'priority', INTERACTIVE)
+
+
+@contextmanager
+def request_context(user_id, priority):
+    """Temporarily attribute LLM calls on the current thread to a user and priority lane"""
+    previous = current_request_context()
+    set_request_context(user_id, priority)
+    try:
+        yield
+    finally:
+        set_request_context(*previous)
+
+
+def is_rate_limit_error(error):
+    """Check whether an exception from the LLM client is an HTTP 429 response"""
+    for attribute in ('status_code', 'http_status', 'status'):
+        if getattr(error, attribute, None) == 429:
+            return True
+    return 'TooManyRequests' in type(error).__name__
+
+
+class TokenBucket:
+    """Classic token bucket: refills at `rate` tokens per second up to `capacity`"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_take(self):
+        """Take a token if one is available; otherwise return seconds until the next one"""
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class Ticket:
+    """A call's place in the admission queue; ordered by priority, then arrival"""
+
+    def __init__(self, scheduler, priority):
+        self.scheduler = scheduler
+        self.priority = priority
+        self.sequence = next(scheduler.sequence)
+
+    def __lt__(self, other):
+        return (self.priority, self.sequence) < (other.priority, other.sequence)
+
+    def promote(self, priority):
+        """Move the call to a more urgent lane, e.g. when an interactive request joins it"""
+        self.scheduler.promote(self, priority)
+
+
+class LLMScheduler:
+    """Admission control for LLM calls
+
+    Every call first takes a token from its user's bucket, then waits for a
+    global concurrency slot. Slots are granted in priority order (interactive
+    before background, FIFO within a lane). The global limit follows AIMD:
+    it grows by one per limit's worth of successful calls and halves whenever
+    the provider answers with HTTP 429.
+    """
+
+    def __init__(self, max_concurrency=8, min_concurrency=1, user_rate=20 / 60, user_burst=5, max_user_wait=30):
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.limit = float(max_concurrency)
+        self.user_rate = user_rate
+        self.user_burst = user_burst
+        self.max_user_wait = max_user_wait
+
+        self.condition = threading.Condition()
+        self.active = 0
+        self.waiters = []
+        self.sequence = itertools.count()
+        self.buckets = {}
+
+        self.admitted = 0
+        self.rejected = 0
+        self.rate_limited = 0
+
+    def take_user_token(self, user_id):
+        """Wait for a token from the user's bucket, or raise if the wait would be too long"""
+        if user_id is None:
+            return
+        while True:
+            with self.condition:
+                bucket = self.buckets.setdefault(user_id, TokenBucket(self.user_rate, self.user_burst))
+                wait = bucket.try_take()
+                if wait and wait > self.max_user_wait:
+                    self.rejected += 1
+                    raise RateLimitExceeded(
+                        f"Too many AI requests. Please wait {wait:.0f} seconds and try again."
+                    )
+            if not wait:
+                return
+            time.sleep(wait)
+
+    def ticket(self, priority=INTERACTIVE):
+        """Create a place in the queue that can be promoted before and while it waits"""
+        return Ticket(self, priority)
+
+    def acquire(self, user_id=None, priority=INTERACTIVE, ticket=None):
+        """Block until the call is admitted"""
+        self.take_user_token(user_id)
+
+        with self.condition:
+            ticket = ticket or Ticket(self, priority)
+            heapq.heappush(self.waiters, ticket)
+            while self.waiters[0] is not ticket or self.active >= int(self.limit):
+                self.condition.wait()
+            heapq.heappop(self.waiters)
+            self.active += 1
+            self.admitted += 1
+            # The next waiter may also fit under the limit
+            self.condition.notify_all()
+
+    def promote(self, ticket, priority):
+        """Raise a ticket to a more urgent priority, reordering the queue if it is waiting"""
+        with self.condition:
+            if priority >= ticket.priority:
+                return
+            ticket.priority = priority
+            if any(waiter is ticket for waiter in self.waiters):
+                heapq.heapify(self.waiters)
+                self.condition.notify_all()
+
+    def release(self, rate_limited=False):
+        """Return a slot and adapt the concurrency limit to the outcome of the call"""
+        with self.condition:
+            self.active -= 1
+            if rate_limited:
+                self.rate_limited += 1
+                self.limit = max(self.min_concurrency, self.limit / 2)
+            else:
+                self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+            self.condition.notify_all()
+
+    @contextmanager
+    def slot(self, user_id=None, priority=INTERACTIVE, ticket=None):
+        """Hold an admission slot for the duration of a call"""
+        self.acquire(user_id, priority, ticket)
+        rate_limited = False
+        try:
+            yield
+        except Exception as e:
+            rate_limited = is_rate_limit_error(e)
+            raise
+        finally:
+            self.release(rate_limited)
+
+    def get_metrics(self):
+        """Return the current limit, queue depth and admission counters"""
+        with self.condition:
+            return {
+                'limit': int(self.limit),
+                'active': self.active,
+                'waiting': len(self.waiters),
+                'interactive_waiting': sum(1 for ticket in self.waiters if ticket.priority == INTERACTIVE),
+                'admitted': self.admitted,
+                'rejected': self.rejected,
+                'rate_limited': self.rate_limited
+            }
+
+
+# Shared by every session in the process
+scheduler = LLMScheduler(
+    max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", "8")),
+    user_rate=float(os.getenv("LLM_USER_REQUESTS_PER_MINUTE", "20")) / 60,
+    user_burst=int(os.getenv("LLM_USER_BURST", "5"))
+)
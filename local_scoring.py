@@ -0,0 +1,119 @@
+import re
+from collections import Counter
+
+# Common English and job-posting filler words that never count as keywords
+STOP_WORDS = {
+    'a', 'ability', 'able', 'about', 'above', 'across', 'after', 'all', 'also', 'an', 'and', 'any',
+    'are', 'as', 'at', 'be', 'been', 'being', 'both', 'but', 'by', 'can', 'candidate', 'company', 'could', 'do', 'etc',
+    'each', 'experience', 'for', 'from', 'good', 'great', 'has', 'have', 'having', 'help', 'how',
+    'if', 'in', 'including', 'into', 'is', 'it', 'its', 'job', 'join', 'just', 'knowledge', 'like',
+    'looking', 'make', 'may', 'more', 'most', 'must', 'new', 'nice', 'of', 'on', 'one', 'or', 'other',
+    'our', 'out', 'over', 'plus', 'preferred', 'required', 'requirements', 'responsibilities',
+    'role', 'should', 'skills', 'strong', 'such', 'team', 'than', 'that', 'the', 'their', 'them',
+    'then', 'there', 'these', 'they', 'this', 'through', 'to', 'understanding', 'up', 'us', 'using',
+    'we', 'well', 'what', 'when', 'where', 'which', 'who', 'will', 'with', 'within', 'work',
+    'working', 'would', 'year', 'years', 'you', 'your'
+}
+
+# Skill terms used when no skills taxonomy file is available (see skill_matcher)
+SKILL_TERMS = {
+    'agile', 'airflow', 'angular', 'ansible', 'api', 'aws', 'azure', 'bigquery', 'c', 'c#', 'c++',
+    'ci/cd', 'communication', 'css', 'data analysis', 'data engineering', 'data science',
+    'deep learning', 'django', 'docker', 'excel', 'fastapi', 'flask', 'gcp', 'git', 'go', 'graphql',
+    'hadoop', 'html', 'java', 'javascript', 'jenkins', 'jira', 'kafka', 'keras', 'kotlin',
+    'kubernetes', 'leadership', 'linux', 'machine learning', 'microservices', 'mongodb', 'mysql',
+    'nlp', 'node.js', 'nosql', 'numpy', 'pandas', 'postgresql', 'power bi', 'python', 'pytorch',
+    'r', 'react', 'redis', 'rest', 'ruby', 'rust', 'scala', 'scikit-learn', 'scrum', 'snowflake',
+    'spark', 'sql', 'statistics', 'swift', 'tableau', 'tensorflow', 'terraform', 'typescript'
+}
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#./-]*")
+
+
+def normalize_text(text):
+    """Lowercase text and collapse all runs of whitespace"""
+    return re.sub(r'\s+', ' ', (text or '').lower()).strip()
+
+
+def tokenize(text):
+    """Split text into lowercase word tokens, keeping symbols used in skill names (c++, node.js)"""
+    return [token.rstrip('./-') for token in TOKEN_PATTERN.findall((text or '').lower())]
+
+
+def find_skills(text):
+    """Return the canonical skills mentioned in the text, in order of first appearance
+
+    Aliases from the skills taxonomy count as their canonical skill (k8s -> kubernetes).
+    """
+    from skill_matcher import get_skill_matcher
+    return get_skill_matcher().skills(normalize_text(text))
+
+
+def extract_keywords(text, limit=30):
+    """Extract the most relevant keywords from text: known skills first, then frequent terms"""
+    keywords = find_skills(text)
+    counts = Counter(
+        token for token in tokenize(text)
+        if len(token) > 2 and token not in STOP_WORDS and not token.isdigit()
+    )
+    for token, _ in counts.most_common():
+        if len(keywords) >= limit:
+            break
+        # Skill aliases (k8s, postgres) are already listed under their canonical name
+        if token not in keywords and not find_skills(token):
+            keywords.append(token)
+    return keywords[:limit]
+
+
+def contains_keyword(normalized_resume, keyword):
+    """Check whether a keyword appears as a whole term in already-normalized resume text"""
+    pattern = r'(?<![a-z0-9+#])' + re.escape(keyword.lower()) + r'(?![a-z0-9+#])'
+    return re.search(pattern, normalized_resume) is not None
+
+
+def score_resume(resume_text, requirements):
+    """Compute a keyword-overlap ATS score from a parsed job requirements record
+
+    Must-have skills weigh twice as much as nice-to-have skills and general keywords.
+    resume_text may also be a ParsedResume, whose normalized text is reused.
+    Returns a dict in the same shape as the LLM analysis ('JD Match', 'MissingKeywords')
+    plus the list of matched keywords.
+    """
+    if isinstance(resume_text, str):
+        normalized_resume = normalize_text(resume_text)
+        resume_skills = set(find_skills(normalized_resume))
+    else:
+        normalized_resume = resume_text.normalized
+        resume_skills = set(resume_text.skill_names())
+
+    weighted_terms = {}
+    for keyword in requirements.get('keywords', []):
+        weighted_terms[keyword] = 1
+    for skill in requirements.get('nice_to_have', []):
+        weighted_terms[skill] = 1
+    for skill in requirements.get('must_have', []):
+        weighted_terms[skill] = 2
+
+    if not weighted_terms:
+        return {'JD Match': '0%', 'MissingKeywords': [], 'MatchedKeywords': []}
+
+    matched, missing = [], []
+    matched_weight = 0
+    for term, weight in weighted_terms.items():
+        # Skills also count when the resume uses one of their aliases
+        if term in resume_skills or contains_keyword(normalized_resume, term):
+            matched.append(term)
+            matched_weight += weight
+        else:
+            missing.append(term)
+
+    # List missing must-have skills before everything else
+    must_have = set(requirements.get('must_have', []))
+    missing.sort(key=lambda term: term not in must_have)
+
+    score = round(100 * matched_weight / sum(weighted_terms.values()))
+    return {
+        'JD Match': f"{score}%",
+        'MissingKeywords': missing,
+        'MatchedKeywords': matched
+    }
@@ -0,0 +1,287 @@
+import argparse
+import json
+import os
+import numpy as np
+from scipy import sparse
+from local_scoring import tokenize, find_skills, STOP_WORDS
+
+
+class MatchingEngine:
+    """Score every resume against every job description with sparse term/skill vectors"""
+
+    def __init__(self, skill_weight=2.0):
+        self.skill_weight = skill_weight
+        self.vocabulary = {}
+        self.resume_ids = []
+        self.jd_ids = []
+        self.scores = None
+
+    def document_terms(self, text):
+        """Count the terms of a document; detected skills become extra 'skill:' features"""
+        counts = {}
+        for token in tokenize(text):
+            if len(token) > 1 and token not in STOP_WORDS:
+                counts[token] = counts.get(token, 0) + 1
+        for skill in find_skills(text):
+            counts['skill:' + skill] = counts.get('skill:' + skill, 0) + 1
+        return counts
+
+    def _count_matrix(self, term_counts):
+        """Build a CSR count matrix over the shared vocabulary"""
+        rows, cols, data = [], [], []
+        for row, counts in enumerate(term_counts):
+            for term, count in counts.items():
+                rows.append(row)
+                cols.append(self.vocabulary[term])
+                data.append(count)
+        return sparse.csr_matrix(
+            (np.array(data, dtype=np.float32), (rows, cols)),
+            shape=(len(term_counts), len(self.vocabulary))
+        )
+
+    def _weight(self, counts, idf, feature_weights):
+        """Apply sublinear tf, idf and skill weights, then L2-normalize every row"""
+        weighted = counts.copy()
+        weighted.data = 1.0 + np.log(weighted.data)
+        weighted = weighted.multiply(idf * feature_weights).tocsr()
+        norms = np.sqrt(np.asarray(weighted.multiply(weighted).sum(axis=1)).ravel())
+        norms[norms == 0] = 1.0
+        return sparse.diags(1.0 / norms) @ weighted
+
+    def fit(self, resumes, job_descriptions):
+        """Compute the full resume x JD cosine similarity matrix
+
+        resumes and job_descriptions are dicts mapping an id to document text.
+        """
+        self.resume_ids = list(resumes.keys())
+        self.jd_ids = list(job_descriptions.keys())
+
+        resume_terms = [self.document_terms(text) for text in resumes.values()]
+        jd_terms = [self.document_terms(text) for text in job_descriptions.values()]
+
+        self.vocabulary = {}
+        for counts in resume_terms + jd_terms:
+            for term in counts:
+                self.vocabulary.setdefault(term, len(self.vocabulary))
+
+        resume_counts = self._count_matrix(resume_terms)
+        jd_counts = self._count_matrix(jd_terms)
+
+        # Document frequency over the combined pool of resumes and JDs
+        document_count = len(resume_terms) + len(jd_terms)
+        document_frequency = (
+            np.bincount(resume_counts.indices, minlength=len(self.vocabulary)) +
+            np.bincount(jd_counts.indices, minlength=len(self.vocabulary))
+        )
+        idf = np.log((1 + document_count) / (1 + document_frequency)) + 1.0
+
+        feature_weights = np.ones(len(self.vocabulary), dtype=np.float32)
+        for term, column in self.vocabulary.items():
+            if term.startswith('skill:'):
+                feature_weights[column] = self.skill_weight
+
+        resume_vectors = self._weight(resume_counts, idf, feature_weights)
+        jd_vectors = self._weight(jd_counts, idf, feature_weights)
+
+        # One sparse matrix product scores every pair at once
+        self.scores = (resume_vectors @ jd_vectors.T).toarray()
+        return self.scores
+
+    def _top_k(self, matrix, k):
+        """Return (indices, scores) of the k best columns for every row of a dense matrix"""
+        k = min(k, matrix.shape[1])
+        if k == 0:
+            empty = np.empty((matrix.shape[0], 0))
+            return empty.astype(int), empty
+        candidates = np.argpartition(-matrix, k - 1, axis=1)[:, :k]
+        candidate_scores = np.take_along_axis(matrix, candidates, axis=1)
+        order = np.argsort(-candidate_scores, axis=1, kind='stable')
+        return np.take_along_axis(candidates, order, axis=1), np.take_along_axis(candidate_scores, order, axis=1)
+
+    def top_jds_per_resume(self, k=5):
+        """Best matching job descriptions for each resume"""
+        indices, scores = self._top_k(self.scores, k)
+        return {
+            resume_id: [(self.jd_ids[j], float(score)) for j, score in zip(indices[i], scores[i])]
+            for i, resume_id in enumerate(self.resume_ids)
+        }
+
+    def top_resumes_per_jd(self, k=5):
+        """Best matching resumes for each job description"""
+        indices, scores = self._top_k(self.scores.T, k)
+        return {
+            jd_id: [(self.resume_ids[r], float(score)) for r, score in zip(indices[j], scores[j])]
+            for j, jd_id in enumerate(self.jd_ids)
+        }
+
+
+def read_document(path):
+    """Return the text of a .pdf or .txt document"""
+    from pdf_utils import input_pdf_text
+
+    if path.lower().endswith('.pdf'):
+        return input_pdf_text(path)
+    with open(path, encoding='utf-8', errors='ignore') as f:
+        return f.read()
+
+
+def iter_documents(directory):
+    """Yield (file name, text) for the .pdf and .txt documents in a directory, one at a time"""
+    for name in sorted(os.listdir(directory)):
+        if name.lower().endswith(('.pdf', '.txt')):
+            yield name, read_document(os.path.join(directory, name))
+
+
+def load_documents(directory):
+    """Load .pdf and .txt documents from a directory, keyed by file name"""
+    return dict(iter_documents(directory))
+
+
+def load_library_job_descriptions(db_path):
+    """Load every job description saved in the JD library"""
+    from jd_library import JobDescriptionLibrary
+
+    library = JobDescriptionLibrary(db_path)
+    return {
+        f"{record['title']} (#{record['id']})": record['jd_text']
+        for record in library.list_job_descriptions()
+    }
+
+
+def show_matching_page():
+    """Display the Candidate Matching page"""
+    import streamlit as st
+    from pdf_utils import input_pdf_text
+
+    from candidate_index import index_resume
+    from resume_model import hash_resume
+
+    st.title("🧮 Candidate Matching Matrix")
+    st.markdown("Score many resumes against many job descriptions in one pass, without any LLM calls.")
+
+    uploaded_files = st.file_uploader(
+        "Upload Resumes", type="pdf", accept_multiple_files=True,
+        help="Upload every candidate resume you want to compare"
+    )
+
+    library_jds = load_library_job_descriptions("users.db")
+    selected_jds = st.multiselect(
+        "Job Descriptions from Library",
+        options=list(library_jds.keys()),
+        default=list(library_jds.keys()),
+        help="Job descriptions are added to the library when you analyze a resume against them"
+    )
+    top_k = st.slider("Top matches to show", min_value=1, max_value=20, value=5)
+
+    if st.button("Compute Matching Matrix", type="primary"):
+        if not uploaded_files or not selected_jds:
+            st.error("Please upload at least one resume and select at least one job description.")
+            return
+
+        resumes = {uploaded_file.name: input_pdf_text(uploaded_file) for uploaded_file in uploaded_files}
+        job_descriptions = {name: library_jds[name] for name in selected_jds}
+
+        for name, text in resumes.items():
+            index_resume(hash_resume(text), text, name)
+
+        engine = MatchingEngine()
+        scores = engine.fit(resumes, job_descriptions)
+
+        st.subheader("📊 Score Matrix")
+        st.dataframe({
+            'Resume': engine.resume_ids,
+            **{jd_id: [f"{score:.0%}" for score in scores[:, j]] for j, jd_id in enumerate(engine.jd_ids)}
+        })
+
+        col1, col2 = st.columns(2)
+        with col1:
+            st.subheader("🎯 Best Roles per Candidate")
+            for resume_id, matches in engine.top_jds_per_resume(top_k).items():
+                st.markdown(f"**{resume_id}**")
+                for jd_id, score in matches:
+                    st.markdown(f"- {jd_id}: {score:.0%}")
+        with col2:
+            st.subheader("👥 Best Candidates per Role")
+            for jd_id, matches in engine.top_resumes_per_jd(top_k).items():
+                st.markdown(f"**{jd_id}**")
+                for resume_id, score in matches:
+                    st.markdown(f"- {resume_id}: {score:.0%}")
+
+    show_candidate_search(library_jds)
+
+    from ranking import show_screening_section
+    show_screening_section(library_jds)
+
+
+def show_candidate_search(library_jds):
+    """Find the indexed candidates most similar to a job description"""
+    import time
+    import streamlit as st
+    from candidate_index import get_candidate_index, embed_text
+
+    st.markdown("---")
+    st.subheader("🔎 Similar Candidates Search")
+    index = get_candidate_index()
+    st.caption(f"Searches every resume analyzed or matched so far ({len(index)} indexed).")
+
+    source = st.selectbox("Job Description", options=["Paste a job description"] + list(library_jds.keys()))
+    jd_text = st.text_area("Job Description Text") if source == "Paste a job description" else library_jds[source]
+    k = st.slider("Candidates to return", min_value=1, max_value=50, value=10)
+
+    if st.button("Find Similar Candidates"):
+        if not jd_text.strip():
+            st.error("Please provide a job description.")
+            return
+        started = time.perf_counter()
+        results = index.search(embed_text(jd_text), k)
+        elapsed = (time.perf_counter() - started) * 1000
+        if not results:
+            st.info("No candidates indexed yet.")
+            return
+        st.dataframe({
+            'Candidate': [label or doc_id[:12] for doc_id, label, _ in results],
+            'Similarity': [f"{score:.0%}" for _, _, score in results]
+        })
+        st.caption(f"Searched in {elapsed:.1f} ms")
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Compute the resume x job description matching matrix")
+    parser.add_argument("--resumes", required=True, help="Directory of resume .pdf/.txt files")
+    parser.add_argument("--jds", help="Directory of job description .pdf/.txt files")
+    parser.add_argument("--jd-library", help="SQLite database whose JD library should be used")
+    parser.add_argument("--top-k", type=int, default=5, help="Number of matches to report")
+    parser.add_argument("--by", choices=["resume", "jd"], default="jd",
+                        help="Report top JDs per resume or top resumes per JD")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    job_descriptions = {}
+    if args.jds:
+        job_descriptions.update(load_documents(args.jds))
+    if args.jd_library:
+        job_descriptions.update(load_library_job_descriptions(args.jd_library))
+    if not job_descriptions:
+        parser.error("no job descriptions found; pass --jds and/or --jd-library")
+
+    resumes = load_documents(args.resumes)
+    if not resumes:
+        parser.error(f"no resumes found in {args.resumes}")
+
+    engine = MatchingEngine()
+    engine.fit(resumes, job_descriptions)
+    results = engine.top_jds_per_resume(args.top_k) if args.by == "resume" else engine.top_resumes_per_jd(args.top_k)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    for row_id, matches in results.items():
+        print(row_id)
+        for match_id, score in matches:
+            print(f"  {score:6.1%}  {match_id}")
+
+
+if __name__ == "__main__":
+    main()
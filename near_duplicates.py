@@ -0,0 +1,89 @@
+import re
+import threading
+import zlib
+import numpy as np
+
+NUM_PERMUTATIONS = 128
+# 16 bands of 8 rows: pairs above ~0.7 Jaccard similarity almost always share a bucket
+LSH_BANDS = 16
+SHINGLE_WORDS = 3
+DUPLICATE_THRESHOLD = 0.85
+
+# Largest prime below 2**32; (a * x + b) stays below 2**64 for 32-bit x, a and b
+_PRIME = np.uint64(4294967291)
+_random = np.random.RandomState(20240601)
+_PERM_A = _random.randint(1, 2 ** 32 - 1, size=NUM_PERMUTATIONS, dtype=np.uint64)
+_PERM_B = _random.randint(0, 2 ** 32 - 1, size=NUM_PERMUTATIONS, dtype=np.uint64)
+
+_WORD_PATTERN = re.compile(r'[a-z0-9]+')
+
+
+def shingles(text, size=SHINGLE_WORDS):
+    """Return the set of hashed word n-grams of a text, ignoring case and punctuation"""
+    words = _WORD_PATTERN.findall((text or '').lower())
+    if len(words) < size:
+        return {zlib.crc32(' '.join(words).encode())} if words else set()
+    return {zlib.crc32(' '.join(words[i:i + size]).encode()) for i in range(len(words) - size + 1)}
+
+
+def minhash_signature(text):
+    """Compute the MinHash signature of a text as a uint32 array"""
+    hashed = np.fromiter(shingles(text), dtype=np.uint64)
+    if hashed.size == 0:
+        return np.full(NUM_PERMUTATIONS, 2 ** 32 - 1, dtype=np.uint32)
+    # One row per permutation, one column per shingle
+    permuted = (_PERM_A[:, None] * hashed[None, :] + _PERM_B[:, None]) % _PRIME
+    return permuted.min(axis=1).astype(np.uint32)
+
+
+def estimate_similarity(signature_a, signature_b):
+    """Estimate the Jaccard similarity of two texts from their signatures"""
+    return float(np.mean(signature_a == signature_b))
+
+
+def band_keys(signature, bands=LSH_BANDS):
+    """Split a signature into band hashes used as LSH bucket keys"""
+    rows = len(signature) // bands
+    return [(band, signature[band * rows:(band + 1) * rows].tobytes()) for band in range(bands)]
+
+
+class LSHIndex:
+    """In-memory locality-sensitive hashing index over MinHash signatures"""
+
+    def __init__(self, bands=LSH_BANDS):
+        self.bands = bands
+        self.buckets = {}
+        self.signatures = {}
+        self.lock = threading.Lock()
+
+    def add(self, key, signature):
+        """Index a signature under a key"""
+        with self.lock:
+            self.signatures[key] = signature
+            for band_key in band_keys(signature, self.bands):
+                self.buckets.setdefault(band_key, set()).add(key)
+
+    def remove(self, key):
+        """Drop a key from the index"""
+        with self.lock:
+            signature = self.signatures.pop(key, None)
+            if signature is None:
+                return
+            for band_key in band_keys(signature, self.bands):
+                bucket = self.buckets.get(band_key)
+                if bucket is not None:
+                    bucket.discard(key)
+                    if not bucket:
+                        del self.buckets[band_key]
+
+    def query(self, signature, threshold=DUPLICATE_THRESHOLD):
+        """Return (similarity, key) pairs for indexed signatures at or above threshold, most similar first"""
+        with self.lock:
+            candidates = set()
+            for band_key in band_keys(signature, self.bands):
+                candidates |= self.buckets.get(band_key, set())
+            scored = [(estimate_similarity(signature, self.signatures[key]), key) for key in candidates]
+        return sorted((pair for pair in scored if pair[0] >= threshold), reverse=True)
+
+    def __len__(self):
+        return len(self.signatures)
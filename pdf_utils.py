@@ -0,0 +1,10 @@
+import PyPDF2 as pdf
+
+def input_pdf_text(uploaded_file):
+    """Extract the text of every page of a PDF (path or file-like object)"""
+    reader=pdf.PdfReader(uploaded_file)
+    text=""
+    for page in range(len(reader.pages)):
+        page=reader.pages[page]
+        text+=str(page.extract_text())
+    return text
@@ -0,0 +1,314 @@
+import argparse
+import heapq
+import os
+import threading
+import uuid
+from dataclasses import dataclass
+
+# Finished screening runs kept so their shortlists can still be paged through
+KEEP_FINISHED_RUNS = 16
+
+
+@dataclass
+class RankedCandidate:
+    """One shortlisted candidate; ordered by score, then tiebreak, then id"""
+    __slots__ = ('candidate_id', 'score', 'tiebreak', 'payload')
+    candidate_id: str
+    score: float
+    tiebreak: float
+    payload: dict
+
+    def sort_key(self):
+        """Key that sorts the best candidate first; ids keep equal scores in a fixed order"""
+        return (-self.score, -self.tiebreak, self.candidate_id)
+
+    def __lt__(self, other):
+        # heapq keeps the smallest entry on top, so "less than" means "ranks worse"
+        return self.sort_key() > other.sort_key()
+
+
+class TopKRanker:
+    """Keep the k best candidates from a stream of scores in O(k) memory
+
+    Scores can be offered from any number of threads while the shortlist is read.
+    Candidates are ordered by score, then tiebreak, then candidate id, so the order
+    (and therefore every page of it) is the same however the scores arrived.
+    """
+
+    def __init__(self, k):
+        self.k = k
+        self.heap = []
+        self.members = {}
+        self.seen = 0
+        self.lock = threading.Lock()
+
+    def offer(self, candidate_id, score, tiebreak=0.0, payload=None):
+        """Consider a scored candidate; returns True if it is now on the shortlist"""
+        candidate = RankedCandidate(candidate_id, score, tiebreak, payload or {})
+        with self.lock:
+            self.seen += 1
+            previous = self.members.get(candidate_id)
+            if previous is not None:
+                # A rescored candidate replaces its earlier entry
+                self.heap.remove(previous)
+                heapq.heapify(self.heap)
+                del self.members[candidate_id]
+
+            if len(self.heap) < self.k:
+                heapq.heappush(self.heap, candidate)
+            elif self.heap and self.heap[0] < candidate:
+                dropped = heapq.heapreplace(self.heap, candidate)
+                del self.members[dropped.candidate_id]
+            else:
+                return False
+            self.members[candidate_id] = candidate
+            return True
+
+    def threshold(self):
+        """Score a new candidate must beat once the shortlist is full, or None"""
+        with self.lock:
+            return self.heap[0].score if len(self.heap) >= self.k else None
+
+    def results(self):
+        """Return the shortlist, best first"""
+        with self.lock:
+            return sorted(self.heap, key=RankedCandidate.sort_key)
+
+    def page_count(self, page_size=10):
+        """Number of pages the shortlist fills; an empty shortlist still has one"""
+        with self.lock:
+            return max(1, -(-len(self.heap) // page_size))
+
+    def page(self, page_number, page_size=10):
+        """Return one page (numbered from 1) of the shortlist, its page number and the number of pages"""
+        ranked = self.results()
+        pages = max(1, -(-len(ranked) // page_size))
+        # Out-of-range page numbers show the nearest page
+        page_number = min(max(1, page_number), pages)
+        start = (page_number - 1) * page_size
+        return ranked[start:start + page_size], page_number, pages
+
+    def __len__(self):
+        return len(self.heap)
+
+
+class ScreeningRun:
+    """Score a pool of resumes against one job description on a background thread
+
+    Every score goes into a TopKRanker as soon as it is computed, so the shortlist
+    can be read while the pool is still being scored.
+    """
+
+    def __init__(self, resumes, jd_text, k=20, total=None):
+        from jd_library import get_requirements
+
+        self.id = uuid.uuid4().hex
+        self.resumes = resumes
+        self.jd_text = jd_text
+        self.requirements = get_requirements(jd_text)
+        self.ranker = TopKRanker(k)
+        self.total = total
+        self.scored = 0
+        self.failed = 0
+        self.error = None
+        self.done = False
+        self.cancelled = threading.Event()
+        self.thread = threading.Thread(target=self.run, name=f"screening-{self.id[:8]}", daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def score(self, text):
+        """Score one resume: local keyword match first, embedding similarity as the tiebreak"""
+        from candidate_index import embed_text
+        from chunked_analysis import percentage_value
+        from local_scoring import score_resume
+        from resume_model import get_parsed_resume
+
+        result = score_resume(get_parsed_resume(text), self.requirements)
+        similarity = float(embed_text(text) @ self.jd_vector)
+        return percentage_value(result['JD Match']), similarity, result['MissingKeywords']
+
+    def run(self):
+        """Score the whole pool; resumes whose text is None count as unreadable"""
+        from candidate_index import embed_text
+
+        self.jd_vector = embed_text(self.jd_text)
+        try:
+            for name, text in self.resumes:
+                if self.cancelled.is_set():
+                    break
+                if text is None:
+                    self.failed += 1
+                    continue
+                try:
+                    match, similarity, missing = self.score(text)
+                except Exception:
+                    self.failed += 1
+                    continue
+                self.ranker.offer(name, match, similarity, {'missing': missing[:5]})
+                self.scored += 1
+        except Exception as e:
+            # Reading the pool itself failed; keep what was scored so far
+            self.error = str(e)
+        finally:
+            self.done = True
+
+    def is_running(self):
+        return self.thread.is_alive()
+
+    def cancel(self):
+        self.cancelled.set()
+
+
+_screening_runs = {}
+_screening_runs_lock = threading.Lock()
+
+
+def start_screening(resumes, jd_text, k=20, total=None):
+    """Start a screening run shared across Streamlit reruns; returns its id"""
+    run = ScreeningRun(resumes, jd_text, k, total)
+    with _screening_runs_lock:
+        # Forget the oldest finished runs so the registry does not grow without bound
+        finished = [run_id for run_id, other in _screening_runs.items() if other.done]
+        for run_id in finished[:max(0, len(finished) - KEEP_FINISHED_RUNS)]:
+            del _screening_runs[run_id]
+        _screening_runs[run.id] = run
+    run.start()
+    return run.id
+
+
+def get_screening_run(run_id):
+    """Return a screening run by id, or None once it has been forgotten"""
+    with _screening_runs_lock:
+        return _screening_runs.get(run_id)
+
+
+def show_screening_section(library_jds):
+    """Rank a large pool of resumes against one job description, showing the shortlist live"""
+    import streamlit as st
+
+    st.markdown("---")
+    st.subheader("🏆 Shortlist a Large Pool")
+    st.caption("Scores every resume locally and keeps only the best candidates; the shortlist updates while scoring runs.")
+
+    uploaded_files = st.file_uploader("Resume Pool", type="pdf", accept_multiple_files=True, key="screening_pool")
+    source = st.selectbox("Job Description", options=list(library_jds.keys()), key="screening_jd")
+    k = st.slider("Shortlist size", min_value=5, max_value=200, value=20, key="screening_k")
+
+    if st.button("Start Shortlisting", type="primary"):
+        if not uploaded_files or not source:
+            st.error("Please upload resumes and pick a job description from the library.")
+        else:
+            # Copy the upload bytes so extraction can continue after this rerun ends
+            pool = [(uploaded_file.name, uploaded_file.getvalue()) for uploaded_file in uploaded_files]
+            resumes = _extract_pool(pool)
+            previous = get_screening_run(st.session_state.get('screening_run'))
+            if previous is not None:
+                previous.cancel()
+            st.session_state.screening_run = start_screening(resumes, library_jds[source], k, len(pool))
+
+    run_id = st.session_state.get('screening_run')
+    if run_id and get_screening_run(run_id) is not None:
+        _show_shortlist(run_id)
+
+
+def _extract_pool(pool):
+    """Yield (name, text) for uploaded PDFs, with None for files that cannot be read"""
+    from io import BytesIO
+    from pdf_utils import input_pdf_text
+
+    for name, data in pool:
+        try:
+            yield name, input_pdf_text(BytesIO(data))
+        except Exception:
+            yield name, None
+
+
+def _read_pool(directory):
+    """Yield (name, text) for the documents in a directory, with None for files that cannot be read"""
+    from matching import read_document
+
+    for name in sorted(os.listdir(directory)):
+        if not name.lower().endswith(('.pdf', '.txt')):
+            continue
+        try:
+            yield name, read_document(os.path.join(directory, name))
+        except Exception:
+            yield name, None
+
+
+def _show_shortlist(run_id, poll_interval=1):
+    """Render a screening run's progress and shortlist, refreshing only while it runs"""
+    import streamlit as st
+
+    def shortlist(polling):
+        run = get_screening_run(run_id)
+        if run is None:
+            return
+        if polling and run.done:
+            # Rerun the app so the finished shortlist is drawn by a fragment that does not poll
+            st.rerun()
+        if run.total:
+            st.progress(min(run.scored + run.failed, run.total) / run.total,
+                        text=f"Scored {run.scored} of {run.total}" + (f" ({run.failed} unreadable)" if run.failed else ""))
+        if run.error:
+            st.error(f"Shortlisting stopped early: {run.error}")
+        if not run.done and st.button("Stop", key=f"stop_{run_id}"):
+            run.cancel()
+
+        if not len(run.ranker):
+            st.info("No candidates scored yet.")
+            return
+        page_key = f"shortlist_page_{run_id}"
+        # Clamp before the widget is drawn so it shows the page actually displayed
+        page_count = run.ranker.page_count(10)
+        if st.session_state.get(page_key, 1) > page_count:
+            st.session_state[page_key] = page_count
+        page_number = st.number_input("Page", min_value=1, step=1, key=page_key)
+        entries, page_number, pages = run.ranker.page(int(page_number), page_size=10)
+        first_rank = (page_number - 1) * 10 + 1
+        st.dataframe({
+            'Rank': list(range(first_rank, first_rank + len(entries))),
+            'Candidate': [entry.candidate_id for entry in entries],
+            'Match': [f"{entry.score:.0f}%" for entry in entries],
+            'Similarity': [f"{entry.tiebreak:.0%}" for entry in entries],
+            'Top Missing': [', '.join(entry.payload.get('missing', [])) for entry in entries]
+        })
+        st.caption(f"Page {page_number} of {pages} · "
+                   f"{len(run.ranker)} shortlisted from {run.ranker.seen} scored"
+                   + ("" if run.done else " · still scoring"))
+
+    run = get_screening_run(run_id)
+    if run is not None and run.done:
+        st.fragment(shortlist)(polling=False)
+    else:
+        st.fragment(shortlist, run_every=poll_interval)(polling=True)
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Shortlist the best resumes in a directory for a job description")
+    parser.add_argument("--resumes", required=True, help="Directory of resume .pdf/.txt files")
+    parser.add_argument("--jd", required=True, help="Job description .txt file")
+    parser.add_argument("--top-k", type=int, default=20, help="Shortlist size")
+    parser.add_argument("--page", type=int, default=1, help="Page of the shortlist to print")
+    parser.add_argument("--page-size", type=int, default=20, help="Candidates per page")
+    args = parser.parse_args()
+
+    with open(args.jd, encoding='utf-8') as f:
+        run = ScreeningRun(_read_pool(args.resumes), f.read(), args.top_k)
+    run.run()
+    if run.error:
+        parser.error(run.error)
+
+    entries, page_number, pages = run.ranker.page(args.page, args.page_size)
+    first_rank = (page_number - 1) * args.page_size + 1
+    for rank, entry in enumerate(entries, start=first_rank):
+        print(f"{rank:4d}  {entry.score:5.0f}%  {entry.tiebreak:6.3f}  {entry.candidate_id}")
+    print(f"(page {page_number} of {pages}; {run.scored} scored, {run.failed} unreadable)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from local_scoring import normalize_text
+from skill_matcher import get_skill_matcher
+
+EMAIL_PATTERN = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+PHONE_PATTERN = re.compile(r'(\+?1[-.\s]?)?\(?([0-9]{3})\)?[-.\s]?([0-9]{3})[-.\s]?([0-9]{4})')
+
+# A section body runs until the next header-looking line or the end of the text
+_SECTION_END = r'(?=\n\s*[A-Z][A-Z\s]+:|\n\s*[A-Z][a-z]+\s*[A-Z][a-z]+|\Z)'
+SECTION_PATTERNS = {
+    'summary': re.compile(r'(?i)(summary|profile|objective|about)\s*:?\s*(.*?)' + _SECTION_END, re.DOTALL),
+    'experience': re.compile(r'(?i)(experience|work\s*history|employment|professional\s*experience)\s*:?\s*(.*?)' + _SECTION_END, re.DOTALL),
+    'education': re.compile(r'(?i)(education|academic|qualifications)\s*:?\s*(.*?)' + _SECTION_END, re.DOTALL),
+    'skills': re.compile(r'(?i)(skills|technical\s*skills|competencies)\s*:?\s*(.*?)' + _SECTION_END, re.DOTALL),
+    'certifications': re.compile(r'(?i)(certifications|certificates|licenses)\s*:?\s*(.*?)' + _SECTION_END, re.DOTALL),
+    'projects': re.compile(r'(?i)(projects|portfolio|key\s*projects)\s*:?\s*(.*?)' + _SECTION_END, re.DOTALL)
+}
+
+BULLET_PATTERN = re.compile(r'^[ \t]*(?:[-*•●▪◦]|\d{1,2}[.)])[ \t]+(\S[^\n]*?)[ \t]*$', re.MULTILINE)
+
+PARSED_RESUME_CACHE_SIZE = 64
+
+
+@dataclass
+class Span:
+    """A [start, end) range of characters in the resume text"""
+    __slots__ = ('start', 'end')
+    start: int
+    end: int
+
+
+@dataclass
+class ContactInfo:
+    """Offsets of the first email address and phone number found"""
+    __slots__ = ('email', 'phone')
+    email: object
+    phone: object
+
+
+@dataclass
+class Section:
+    """A resume section: its header and body offsets"""
+    __slots__ = ('name', 'header', 'body')
+    name: str
+    header: Span
+    body: Span
+
+
+@dataclass
+class Bullet:
+    """A bullet point line and the section it belongs to (None if outside any section)"""
+    __slots__ = ('section', 'span')
+    section: object
+    span: Span
+
+
+@dataclass
+class SkillMention:
+    """A skill mentioned in the resume, under its canonical name"""
+    __slots__ = ('skill', 'span')
+    skill: str
+    span: Span
+
+
+@dataclass
+class ParsedResume:
+    """A resume parsed once per distinct text
+
+    Every field refers back into `text` by offsets rather than holding copies.
+    """
+    __slots__ = ('text', 'doc_hash', 'normalized', 'contact', 'sections', 'bullets', 'skills')
+    text: str
+    doc_hash: str
+    normalized: str
+    contact: ContactInfo
+    sections: tuple
+    bullets: tuple
+    skills: tuple
+
+    def slice(self, span):
+        """Return the text covered by a span"""
+        return self.text[span.start:span.end] if span is not None else ''
+
+    def section_text(self, name):
+        """Return the body of a section, or '' if the resume has no such section"""
+        for section in self.sections:
+            if section.name == name:
+                return self.slice(section.body)
+        return ''
+
+    def contact_text(self):
+        """Format the contact details the way the section extractor always has"""
+        lines = ''
+        if self.contact.email is not None:
+            lines += f"Email: {self.slice(self.contact.email)}\n"
+        if self.contact.phone is not None:
+            phone = PHONE_PATTERN.fullmatch(self.slice(self.contact.phone))
+            lines += f"Phone: {''.join(phone.groups(''))}\n"
+        return lines
+
+    def as_sections(self):
+        """Return the plain section dict used by prompts and the rest of the app"""
+        sections = {'contact_info': self.contact_text()}
+        for name in SECTION_PATTERNS:
+            sections[name] = self.section_text(name)
+        return sections
+
+    def bullet_texts(self, section=None):
+        """Return the bullet point lines, optionally only those of one section"""
+        return [self.slice(bullet.span) for bullet in self.bullets if section is None or bullet.section == section]
+
+    def skill_names(self):
+        """Return the distinct skills mentioned, in order of first appearance"""
+        return list(dict.fromkeys(mention.skill for mention in self.skills))
+
+    def profile(self):
+        """Summarize what the resume contains for use inside prompts"""
+        found = [section.name for section in self.sections if section.body.end > section.body.start]
+        return (f"Sections: {', '.join(found) or 'none detected'}\n"
+                f"Skills: {', '.join(self.skill_names()) or 'none detected'}\n"
+                f"Bullet Points: {len(self.bullets)}")
+
+
+def hash_resume(resume_text):
+    """Hash resume text so the same document is only parsed once"""
+    return hashlib.sha256((resume_text or '').encode()).hexdigest()
+
+
+def _stripped_span(text, start, end):
+    """Shrink a span so it excludes leading and trailing whitespace"""
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return Span(start, end)
+
+
+def parse_resume(resume_text):
+    """Parse resume text into a ParsedResume"""
+    text = resume_text or ''
+
+    email = EMAIL_PATTERN.search(text)
+    phone = PHONE_PATTERN.search(text)
+    contact = ContactInfo(
+        email=Span(*email.span()) if email else None,
+        phone=Span(*phone.span()) if phone else None
+    )
+
+    sections = []
+    for name, pattern in SECTION_PATTERNS.items():
+        match = pattern.search(text)
+        if match:
+            sections.append(Section(name, Span(*match.span(1)), _stripped_span(text, *match.span(2))))
+
+    bullets = []
+    for match in BULLET_PATTERN.finditer(text):
+        owner = next((section.name for section in sections
+                      if section.body.start <= match.start(1) < section.body.end), None)
+        bullets.append(Bullet(owner, Span(*match.span(1))))
+
+    skills = tuple(SkillMention(match.skill, Span(match.start, match.end)) for match in get_skill_matcher().find(text))
+
+    return ParsedResume(
+        text=text,
+        doc_hash=hash_resume(text),
+        normalized=normalize_text(text),
+        contact=contact,
+        sections=tuple(sections),
+        bullets=tuple(bullets),
+        skills=skills
+    )
+
+
+_parsed_resume_cache = OrderedDict()
+_parsed_resume_lock = threading.Lock()
+
+
+def get_parsed_resume(resume_text):
+    """Return the parsed form of a resume, parsing each distinct document only once per process"""
+    doc_hash = hash_resume(resume_text)
+    with _parsed_resume_lock:
+        parsed = _parsed_resume_cache.get(doc_hash)
+        if parsed is not None:
+            _parsed_resume_cache.move_to_end(doc_hash)
+            return parsed
+
+    parsed = parse_resume(resume_text)
+    with _parsed_resume_lock:
+        _parsed_resume_cache[doc_hash] = parsed
+        while len(_parsed_resume_cache) > PARSED_RESUME_CACHE_SIZE:
+            _parsed_resume_cache.popitem(last=False)
+    return parsed
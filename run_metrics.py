@@ -0,0 +1,126 @@
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from collections import deque
+from functools import wraps
+import streamlit as st
+
+# Number of recent runs kept per scope
+HISTORY_SIZE = 50
+
+
+def record_run(scope, seconds):
+    """Record how long a full script run or fragment run took for this session"""
+    timings = st.session_state.setdefault('run_timings', {})
+    timings.setdefault(scope, deque(maxlen=HISTORY_SIZE)).append(seconds)
+
+
+def timed(scope):
+    """Decorator that records the execution time of every call under the given scope"""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record_run(scope, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def get_run_summary():
+    """Return {scope: {'last_ms', 'avg_ms', 'runs'}} for this session"""
+    summary = {}
+    for scope, timings in st.session_state.get('run_timings', {}).items():
+        if timings:
+            summary[scope] = {
+                'last_ms': timings[-1] * 1000,
+                'avg_ms': sum(timings) / len(timings) * 1000,
+                'runs': len(timings)
+            }
+    return summary
+
+
+# Interactions replayed by the benchmark: (name, page, widget label, values, fragment scope)
+BENCHMARK_INTERACTIONS = [
+    ("Template choice", "Resume Templates", "Select Template Type:",
+     ['Technical (IT/Software)', 'Executive (Leadership)', 'Professional'], "Templates: workspace"),
+    ("Quick action", "Advanced Analysis", "📊 View Full Results", None, "Advanced: quick actions"),
+    ("Advanced template choice", "Advanced Analysis", "Select Template Type:",
+     ['Technical (IT/Software)', 'Executive (Leadership)', 'Professional'], "Templates: selector"),
+]
+
+
+def benchmark(app_path, repeats=30):
+    """Replay local interactions against an app script with Streamlit's AppTest
+
+    AppTest always reruns the whole script, so 'rerun_ms' is what every interaction
+    cost before fragments. 'fragment_ms' is the part a fragment rerun executes, read
+    from the timed() hooks; it is None for scripts without them. A temporary working
+    directory keeps the benchmark away from the real users.db.
+    """
+    from streamlit.testing.v1 import AppTest
+
+    app_path = os.path.abspath(app_path)
+    cwd = os.getcwd()
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        try:
+            for name, page, label, values, scope in BENCHMARK_INTERACTIONS:
+                at = AppTest.from_file(app_path, default_timeout=60)
+                at.session_state.authenticated = True
+                at.session_state.user = {'id': 1, 'username': 'benchmark', 'email': 'benchmark@example.com'}
+                at.session_state.resume_text = "Python developer with Django, PostgreSQL and AWS experience."
+                at.session_state.job_description = "Backend engineer: Python, Docker, Kubernetes, AWS."
+                at.session_state.analysis_results = {
+                    'JD Match': '72%',
+                    'MissingKeywords': ['docker', 'kubernetes'],
+                    'Profile Summary': "Backend engineer with five years of Python."
+                }
+                at.run()
+                at.sidebar.radio[0].set_value(page).run()
+
+                reruns = []
+                for i in range(repeats):
+                    start = time.perf_counter()
+                    if values is None:
+                        next(button for button in at.button if button.label == label).click().run()
+                    else:
+                        widget = next(box for box in at.selectbox if box.label == label)
+                        widget.set_value(values[i % len(values)]).run()
+                    reruns.append(time.perf_counter() - start)
+                    if at.exception:
+                        raise RuntimeError(f"{name}: {at.exception[0].message}")
+
+                timings = at.session_state['run_timings'] if 'run_timings' in at.session_state else {}
+                fragment = list(timings.get(scope, []))[-repeats:]
+                results.append({
+                    'interaction': name,
+                    'rerun_ms': statistics.median(reruns) * 1000,
+                    'fragment_ms': statistics.median(fragment) * 1000 if fragment else None
+                })
+        finally:
+            os.chdir(cwd)
+    return results
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Time script and fragment reruns of local interactions")
+    parser.add_argument("--app", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "app_with_auth.py"),
+                        help="App script to drive, e.g. from an older checkout")
+    parser.add_argument("--repeats", type=int, default=30, help="Times each interaction is replayed")
+    args = parser.parse_args()
+
+    print(f"{'interaction':<26} {'full rerun ms':>14} {'fragment ms':>12}")
+    for result in benchmark(args.app, args.repeats):
+        fragment = f"{result['fragment_ms']:.1f}" if result['fragment_ms'] is not None else "-"
+        print(f"{result['interaction']:<26} {result['rerun_ms']:>14.1f} {fragment:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from jd_library import hash_jd, normalize_jd
+from blob_store import get_blob_store
+
+MEMORY_CAPACITY = 256
+# Least recently used rows beyond this are deleted from the table
+MAX_STORED_SECTIONS = 5000
+
+
+def hash_section(section_content):
+    """Hash a resume section so whitespace and bullet-style edits do not change it
+
+    Case is kept, since it carries through to the optimized text.
+    """
+    return hashlib.sha256(normalize_jd(section_content).encode()).hexdigest()
+
+
+class SectionCache:
+    """Optimized resume sections, cached in memory and in SQLite
+
+    Entries are keyed by (section type, section hash, JD hash, prompt version), so a
+    section is only regenerated when its content, the job description or the prompt
+    changes. The in-memory layer and the table are both bounded with LRU eviction.
+    """
+
+    def __init__(self, db_path="users.db", capacity=MEMORY_CAPACITY, max_rows=MAX_STORED_SECTIONS):
+        self.db_path = db_path
+        self.capacity = capacity
+        self.max_rows = max_rows
+        self.memory = OrderedDict()
+        self.lock = threading.Lock()
+        self.init_database()
+
+    def init_database(self):
+        """Create the optimized sections table if it doesn't exist"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS optimized_sections (
+                cache_key TEXT PRIMARY KEY,
+                section_type TEXT NOT NULL,
+                section_hash TEXT NOT NULL,
+                jd_hash TEXT NOT NULL,
+                prompt_version INTEGER NOT NULL,
+                result TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                last_used_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_optimized_sections_used ON optimized_sections (last_used_at)')
+
+        conn.commit()
+        conn.close()
+
+    def make_key(self, section_type, section_content, job_description, prompt_version):
+        """Build the cache key of one section optimization"""
+        return f"{section_type}:{hash_section(section_content)}:{hash_jd(job_description)}:{prompt_version}"
+
+    def _remember(self, key, result):
+        """Put an entry in the in-memory layer, evicting the least recently used"""
+        with self.lock:
+            self.memory[key] = result
+            self.memory.move_to_end(key)
+            while len(self.memory) > self.capacity:
+                self.memory.popitem(last=False)
+
+    def get(self, key):
+        """Return a cached optimized section, or None"""
+        with self.lock:
+            result = self.memory.get(key)
+            if result is not None:
+                self.memory.move_to_end(key)
+                return result
+
+        conn = sqlite3.connect(self.db_path)
+        try:
+            row = conn.execute('SELECT result FROM optimized_sections WHERE cache_key = ?', (key,)).fetchone()
+            if row is None:
+                return None
+            conn.execute('UPDATE optimized_sections SET last_used_at = CURRENT_TIMESTAMP WHERE cache_key = ?', (key,))
+            conn.commit()
+        finally:
+            conn.close()
+        result = get_blob_store(self.db_path).unpack(row[0])
+        self._remember(key, result)
+        return result
+
+    def put(self, key, result):
+        """Store an optimized section"""
+        section_type, section_hash, jd_hash, prompt_version = key.split(':')
+        conn = sqlite3.connect(self.db_path)
+        try:
+            conn.execute('''
+                INSERT OR REPLACE INTO optimized_sections
+                    (cache_key, section_type, section_hash, jd_hash, prompt_version, result)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (key, section_type, section_hash, jd_hash, int(prompt_version), get_blob_store(self.db_path).pack(result)))
+            conn.execute('''
+                DELETE FROM optimized_sections WHERE cache_key IN (
+                    SELECT cache_key FROM optimized_sections ORDER BY last_used_at DESC, rowid DESC LIMIT -1 OFFSET ?
+                )
+            ''', (self.max_rows,))
+            conn.commit()
+        finally:
+            conn.close()
+        self._remember(key, result)
+
+    def clear(self):
+        """Drop every cached section"""
+        with self.lock:
+            self.memory.clear()
+        conn = sqlite3.connect(self.db_path)
+        try:
+            conn.execute('DELETE FROM optimized_sections')
+            conn.commit()
+        finally:
+            conn.close()
+
+
+_section_cache = None
+_section_cache_lock = threading.Lock()
+
+
+def get_section_cache():
+    """Return the process-wide optimized section cache"""
+    global _section_cache
+    with _section_cache_lock:
+        if _section_cache is None:
+            _section_cache = SectionCache()
+        return _section_cache
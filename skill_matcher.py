@@ -0,0 +1,148 @@
+import os
+import threading
+from collections import deque
+from dataclasses import dataclass
+
+DEFAULT_TAXONOMY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'skills_taxonomy.txt')
+
+# Characters that continue a term; a match must not be preceded or followed by one
+_TERM_CHARS = set('abcdefghijklmnopqrstuvwxyz0123456789+#')
+
+
+@dataclass
+class SkillMatch:
+    """A skill mention: canonical skill name and the [start, end) offsets of the matched text"""
+    __slots__ = ('skill', 'start', 'end')
+    skill: str
+    start: int
+    end: int
+
+
+def load_taxonomy(path):
+    """Load a skills taxonomy file into a dict of lowercase term -> canonical skill
+
+    Each line holds a canonical skill name, optionally followed by a colon and
+    comma-separated aliases. Blank lines and lines starting with # are skipped.
+    """
+    terms = {}
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            canonical, _, aliases = line.partition(':')
+            canonical = canonical.strip().lower()
+            if not canonical:
+                continue
+            terms.setdefault(canonical, canonical)
+            for alias in aliases.split(','):
+                alias = alias.strip().lower()
+                if alias:
+                    terms.setdefault(alias, canonical)
+    return terms
+
+
+def _lower_same_length(text):
+    """Lowercase text without changing its length, so offsets stay valid"""
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered
+    return ''.join(char.lower() if len(char.lower()) == 1 else char for char in text)
+
+
+class SkillMatcher:
+    """Aho-Corasick automaton over every term of a skills taxonomy
+
+    Finds all whole-term mentions of every skill and alias in a single pass over the text.
+    """
+
+    def __init__(self, terms):
+        self.goto = [{}]
+        self.fail = [0]
+        # Per state: (term length, canonical skill) for every term ending there
+        self.outputs = [()]
+        self.term_count = len(terms)
+        # Canonical skill -> every term that maps to it
+        self.aliases = {}
+
+        for term, canonical in terms.items():
+            self.aliases.setdefault(canonical, []).append(term)
+            state = 0
+            for char in term:
+                next_state = self.goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self.goto)
+                    self.goto[state][char] = next_state
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.outputs.append(())
+                state = next_state
+            self.outputs[state] = self.outputs[state] + ((len(term), canonical),)
+
+        # Breadth-first pass to link failure states and merge their outputs
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[next_state] = self.goto[fallback].get(char, 0)
+                self.outputs[next_state] = self.outputs[next_state] + self.outputs[self.fail[next_state]]
+
+    def find_all(self, text):
+        """Return every whole-term match, including overlapping ones, in order of end offset"""
+        lowered = _lower_same_length(text or '')
+        goto, fail, outputs = self.goto, self.fail, self.outputs
+        matches = []
+        state = 0
+        for position, char in enumerate(lowered):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if not outputs[state]:
+                continue
+            end = position + 1
+            if end < len(lowered) and lowered[end] in _TERM_CHARS:
+                continue
+            for length, canonical in outputs[state]:
+                start = end - length
+                if start == 0 or lowered[start - 1] not in _TERM_CHARS:
+                    matches.append(SkillMatch(canonical, start, end))
+        return matches
+
+    def find(self, text):
+        """Return non-overlapping matches, preferring the leftmost and then the longest term"""
+        selected, covered_until = [], 0
+        for match in sorted(self.find_all(text), key=lambda m: (m.start, m.start - m.end)):
+            if match.start >= covered_until:
+                selected.append(match)
+                covered_until = match.end
+        return selected
+
+    def skills(self, text):
+        """Return the distinct canonical skills mentioned in the text, in order of first mention"""
+        return list(dict.fromkeys(match.skill for match in self.find(text)))
+
+
+_skill_matcher = None
+_skill_matcher_lock = threading.Lock()
+
+
+def get_skill_matcher():
+    """Return the process-wide matcher built from the configured skills taxonomy
+
+    Uses SKILLS_TAXONOMY_PATH if set, else the bundled taxonomy, else the built-in skill terms.
+    """
+    global _skill_matcher
+    with _skill_matcher_lock:
+        if _skill_matcher is None:
+            path = os.getenv("SKILLS_TAXONOMY_PATH", DEFAULT_TAXONOMY_PATH)
+            if os.path.exists(path):
+                terms = load_taxonomy(path)
+            else:
+                from local_scoring import SKILL_TERMS
+                terms = {term: term for term in SKILL_TERMS}
+            _skill_matcher = SkillMatcher(terms)
+        return _skill_matcher
@@ -0,0 +1,22 @@
+import time
+from jd_library import JobDescriptionLibrary
+
+JD_TEXT = """Senior Backend Engineer
+
+We are looking for a backend engineer with 5+ years of experience.
+Required: Python, Django, PostgreSQL, Docker and AWS.
+Nice to have: Kubernetes, Kafka and Terraform.
+"""
+
+
+def test_get_or_create_on_new_database(tmp_path):
+    """The first job description saved to a brand-new database must not wait on its own lock"""
+    library = JobDescriptionLibrary(str(tmp_path / "new.db"))
+
+    start = time.perf_counter()
+    record = library.get_or_create(JD_TEXT)
+    assert time.perf_counter() - start < 2
+
+    assert record['use_count'] == 1
+    assert 'Python' in record['jd_text']
+    assert library.get_or_create(JD_TEXT)['use_count'] == 2
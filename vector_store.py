@@ -0,0 +1,119 @@
+import json
+import os
+import threading
+from contextlib import contextmanager
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: appends are still serialized between threads, not between processes
+    fcntl = None
+
+
+class VectorStore:
+    """Append-only float32 matrix on disk, memory-mapped for zero-copy reads
+
+    Rows live in `<name>.f32`; the side index (`<name>.jsonl` unless ids_name is
+    given) holds one {"id", ...metadata} line per row and is the source of truth
+    for the row count.
+    Any number of processes can read the same files through read-only memory maps
+    and pick up rows appended by others with refresh(); appends are serialized
+    with a lock file.
+    """
+
+    def __init__(self, directory, dim, name='vectors', ids_name=None):
+        self.directory = directory
+        self.dim = dim
+        self.row_bytes = dim * np.dtype(np.float32).itemsize
+        self.vectors_path = os.path.join(directory, f'{name}.f32')
+        self.ids_path = os.path.join(directory, f'{ids_name or name}.jsonl')
+        self.lock_path = os.path.join(directory, f'{name}.lock')
+        self.ids = []
+        self.metadata = []
+        self.positions = {}
+        self.ids_offset = 0
+        self.mapped = np.zeros((0, dim), dtype=np.float32)
+        self.lock = threading.RLock()
+        os.makedirs(directory, exist_ok=True)
+        self.refresh()
+
+    @contextmanager
+    def _write_lock(self):
+        """Hold the thread lock and, where supported, an exclusive lock on the lock file"""
+        with self.lock:
+            if fcntl is None:
+                yield
+                return
+            with open(self.lock_path, 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def refresh(self):
+        """Pick up rows appended since the last refresh, by this or any other process"""
+        with self.lock:
+            if os.path.exists(self.ids_path):
+                with open(self.ids_path, 'rb') as f:
+                    f.seek(self.ids_offset)
+                    for line in f:
+                        # A line without its newline is still being written
+                        if not line.endswith(b'\n'):
+                            break
+                        entry = json.loads(line)
+                        self.positions[entry['id']] = len(self.ids)
+                        self.ids.append(entry.pop('id'))
+                        self.metadata.append(entry)
+                        self.ids_offset += len(line)
+
+            if len(self.ids) != len(self.mapped):
+                self._remap()
+            return len(self.ids)
+
+    def _remap(self):
+        """Map exactly the rows listed in the side index"""
+        count = len(self.ids)
+        if count == 0:
+            self.mapped = np.zeros((0, self.dim), dtype=np.float32)
+            return
+        self.mapped = np.memmap(self.vectors_path, dtype=np.float32, mode='r', shape=(count, self.dim))
+
+    def matrix(self):
+        """Return a read-only (rows x dim) view of every stored vector"""
+        return self.mapped
+
+    def append(self, doc_id, vector, metadata=None):
+        """Append a vector; returns its row number, or None if the id is already stored"""
+        vector = np.asarray(vector, dtype=np.float32).reshape(self.dim)
+        with self._write_lock():
+            self.refresh()
+            if doc_id in self.positions:
+                return None
+
+            row = len(self.ids)
+            # Write at the row's offset rather than appending, so a vector left
+            # behind by an interrupted append is overwritten instead of shifting rows
+            with open(self.vectors_path, 'r+b' if os.path.exists(self.vectors_path) else 'wb') as f:
+                f.seek(row * self.row_bytes)
+                f.write(vector.tobytes())
+            with open(self.ids_path, 'ab') as f:
+                # Drop a partial line left by an interrupted append
+                f.truncate(self.ids_offset)
+                f.write((json.dumps({'id': doc_id, **(metadata or {})}) + '\n').encode())
+
+            self.refresh()
+            return row
+
+    def row_of(self, doc_id):
+        """Return the row number of an id, or None"""
+        return self.positions.get(doc_id)
+
+    def get(self, doc_id):
+        """Return a zero-copy view of an id's vector, or None"""
+        row = self.positions.get(doc_id)
+        return None if row is None else self.mapped[row]
+
+    def __len__(self):
+        return len(self.ids)